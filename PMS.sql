@@ -296,3 +296,455 @@ INSERT INTO recruitment (department_id, job_description, job_specification, yiel
 (2, 'Design and develop complex software systems and applications. Guide the engineering team in technical decisions.', 'Master’s degree in Computer Science, 15+ years of experience, expertise in multiple programming languages.', 0.20),
 (3, 'Create and execute comprehensive marketing strategies to promote products and services. Manage brand identity.', 'Bachelor’s degree in Marketing, 8+ years of experience, strong background in digital and content marketing.', 0.30),
 (4, 'Oversee all financial operations, including budgeting, forecasting, and financial reporting.', 'Master’s degree in Finance or Accounting, CPA certification, 12+ years of experience in financial management.', 0.28);
+
+-- 9. Task scheduling
+-- Open tasks are read through the (status, due_date) index so the dashboard cost
+-- grows with the number of open tasks rather than the whole task history.
+CREATE INDEX IF NOT EXISTS idx_tasks_status_due_date ON tasks (status, due_date);
+-- One employee's tasks, already in due-date order (Performance Management).
+CREATE INDEX IF NOT EXISTS idx_tasks_employee_due_date ON tasks (employee_id, due_date);
+
+CREATE OR REPLACE VIEW task_schedule AS
+SELECT t.task_id, t.employee_id, e.name AS employee_name, t.task_description, t.due_date, t.status,
+       CASE
+           WHEN t.due_date < CURRENT_DATE THEN 'Overdue'
+           WHEN t.due_date < CURRENT_DATE + 7 THEN 'Due This Week'
+           ELSE 'Later'
+       END AS bucket
+FROM tasks t
+JOIN employees e ON t.employee_id = e.employee_id
+WHERE t.status IN ('To Do', 'In Progress');
+
+-- 10. Background jobs table
+-- Long-running reports and exports are queued here so their status and results
+-- survive Streamlit reruns and can be downloaded once the job has finished.
+CREATE TABLE IF NOT EXISTS background_jobs (
+    job_id SERIAL PRIMARY KEY,
+    job_type VARCHAR(100) NOT NULL,
+    params JSONB,
+    status VARCHAR(20) NOT NULL DEFAULT 'Queued', -- 'Queued', 'Running', 'Completed', 'Failed', 'Cancelled'
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    cancel_requested BOOLEAN NOT NULL DEFAULT FALSE,
+    result BYTEA,
+    result_filename VARCHAR(255),
+    result_mime VARCHAR(100),
+    created_at TIMESTAMP DEFAULT NOW(),
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    -- The app process running the job refreshes heartbeat_at; a running job whose
+    -- heartbeat stops (the process crashed or restarted) is marked Failed.
+    owner VARCHAR(255),
+    heartbeat_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_background_jobs_status ON background_jobs (status, created_at);
+
+-- 11. Reporting indexes
+-- Department reports are computed one department per worker; these indexes keep
+-- each worker's queries proportional to the size of its own department.
+CREATE INDEX IF NOT EXISTS idx_employees_department ON employees (department_id);
+CREATE INDEX IF NOT EXISTS idx_tasks_employee ON tasks (employee_id);
+CREATE INDEX IF NOT EXISTS idx_performance_ratings_employee ON performance_ratings (employee_id);
+
+-- 12. Employee audit log
+-- Append-only history of the employees table, written by trigger in the same
+-- transaction as the change. Inserts store the full row; updates store only the
+-- columns that changed as a compact JSONB diff. Partitioned by month.
+CREATE TABLE IF NOT EXISTS employee_audit (
+    audit_id BIGSERIAL,
+    employee_id INT NOT NULL,
+    operation CHAR(1) NOT NULL, -- 'S' baseline snapshot, 'I' insert, 'U' update, 'D' delete (section 18)
+    changed_fields JSONB NOT NULL,
+    changed_at TIMESTAMP NOT NULL DEFAULT NOW()
+) PARTITION BY RANGE (changed_at);
+
+CREATE INDEX IF NOT EXISTS idx_employee_audit_employee ON employee_audit (employee_id, changed_at, audit_id);
+
+-- Rows outside the pre-created monthly partitions land here instead of failing.
+CREATE TABLE IF NOT EXISTS employee_audit_default PARTITION OF employee_audit DEFAULT;
+
+CREATE OR REPLACE FUNCTION create_employee_audit_partition(for_month DATE) RETURNS VOID AS $$
+DECLARE
+    start_date DATE := date_trunc('month', for_month);
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF employee_audit FOR VALUES FROM (%L) TO (%L)',
+        'employee_audit_' || to_char(start_date, 'YYYY_MM'), start_date, start_date + INTERVAL '1 month'
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT create_employee_audit_partition((CURRENT_DATE + m * INTERVAL '1 month')::date)
+FROM generate_series(0, 2) m;
+
+CREATE OR REPLACE FUNCTION log_employee_insert() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO employee_audit (employee_id, operation, changed_fields)
+    VALUES (NEW.employee_id, 'I', to_jsonb(NEW));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION log_employee_update() RETURNS TRIGGER AS $$
+DECLARE
+    diff JSONB;
+BEGIN
+    SELECT jsonb_object_agg(n.key, n.value) INTO diff
+    FROM jsonb_each(to_jsonb(NEW)) n
+    JOIN jsonb_each(to_jsonb(OLD)) o ON o.key = n.key
+    WHERE n.value IS DISTINCT FROM o.value;
+
+    IF diff IS NOT NULL THEN
+        INSERT INTO employee_audit (employee_id, operation, changed_fields)
+        VALUES (NEW.employee_id, 'U', diff);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS employees_audit_insert ON employees;
+CREATE TRIGGER employees_audit_insert
+AFTER INSERT ON employees
+FOR EACH ROW EXECUTE FUNCTION log_employee_insert();
+
+-- The WHEN clause skips no-op updates without entering PL/pgSQL at all.
+DROP TRIGGER IF EXISTS employees_audit_update ON employees;
+CREATE TRIGGER employees_audit_update
+AFTER UPDATE ON employees
+FOR EACH ROW WHEN (OLD.* IS DISTINCT FROM NEW.*)
+EXECUTE FUNCTION log_employee_update();
+
+-- Folds a sequence of row snapshots and diffs into a single record (later keys win).
+CREATE OR REPLACE AGGREGATE jsonb_merge_agg(jsonb) (
+    SFUNC = jsonb_concat,
+    STYPE = jsonb,
+    INITCOND = '{}'
+);
+
+-- Baseline snapshot of rows that existed before auditing was enabled.
+INSERT INTO employee_audit (employee_id, operation, changed_fields)
+SELECT e.employee_id, 'S', to_jsonb(e)
+FROM employees e
+WHERE NOT EXISTS (SELECT 1 FROM employee_audit a WHERE a.employee_id = e.employee_id);
+
+-- 13. Optimistic concurrency for employee edits
+-- Every write bumps row_version; partial updates only apply when the version the
+-- editor loaded is still current, so concurrent HR edits are never silently lost.
+ALTER TABLE employees ADD COLUMN IF NOT EXISTS row_version INT NOT NULL DEFAULT 1;
+
+-- 14. Org hierarchy
+-- Each employee's direct manager, plus a closure table holding every
+-- (ancestor, descendant) pair. "All reports under X", "chain above Y" and subtree
+-- rollups are then single indexed lookups. Triggers keep the closure table correct
+-- when employees are added or moved, and reject reporting cycles.
+ALTER TABLE employees
+ADD COLUMN IF NOT EXISTS manager_id INT REFERENCES employees(employee_id) ON DELETE SET NULL;
+
+CREATE INDEX IF NOT EXISTS idx_employees_manager ON employees (manager_id);
+
+CREATE TABLE IF NOT EXISTS employee_hierarchy (
+    ancestor_id INT NOT NULL REFERENCES employees(employee_id) ON DELETE CASCADE,
+    descendant_id INT NOT NULL REFERENCES employees(employee_id) ON DELETE CASCADE,
+    depth INT NOT NULL, -- 0 for the employee itself, 1 for direct reports, ...
+    PRIMARY KEY (ancestor_id, descendant_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_employee_hierarchy_descendant ON employee_hierarchy (descendant_id, depth);
+
+CREATE OR REPLACE FUNCTION add_employee_to_hierarchy() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO employee_hierarchy (ancestor_id, descendant_id, depth)
+    SELECT ancestor_id, NEW.employee_id, depth + 1
+    FROM employee_hierarchy
+    WHERE descendant_id = NEW.manager_id
+    UNION ALL
+    SELECT NEW.employee_id, NEW.employee_id, 0;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION move_employee_in_hierarchy() RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.manager_id IS NOT NULL AND EXISTS (
+        SELECT 1 FROM employee_hierarchy WHERE ancestor_id = NEW.employee_id AND descendant_id = NEW.manager_id
+    ) THEN
+        RAISE EXCEPTION 'Employee % cannot report to % because that would create a reporting cycle',
+            NEW.employee_id, NEW.manager_id;
+    END IF;
+
+    -- Detach the employee's subtree from all of its old ancestors.
+    DELETE FROM employee_hierarchy h
+    USING employee_hierarchy sub, employee_hierarchy sup
+    WHERE sub.ancestor_id = NEW.employee_id
+      AND h.descendant_id = sub.descendant_id
+      AND sup.descendant_id = NEW.employee_id
+      AND sup.depth > 0
+      AND h.ancestor_id = sup.ancestor_id;
+
+    -- Attach it below the new manager and all of the manager's ancestors.
+    INSERT INTO employee_hierarchy (ancestor_id, descendant_id, depth)
+    SELECT sup.ancestor_id, sub.descendant_id, sup.depth + sub.depth + 1
+    FROM employee_hierarchy sup
+    JOIN employee_hierarchy sub ON sub.ancestor_id = NEW.employee_id
+    WHERE sup.descendant_id = NEW.manager_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Every existing employee starts as the root of their own subtree.
+INSERT INTO employee_hierarchy (ancestor_id, descendant_id, depth)
+SELECT employee_id, employee_id, 0 FROM employees
+ON CONFLICT DO NOTHING;
+
+DROP TRIGGER IF EXISTS employees_hierarchy_insert ON employees;
+CREATE TRIGGER employees_hierarchy_insert
+AFTER INSERT ON employees
+FOR EACH ROW EXECUTE FUNCTION add_employee_to_hierarchy();
+
+DROP TRIGGER IF EXISTS employees_hierarchy_update ON employees;
+CREATE TRIGGER employees_hierarchy_update
+AFTER UPDATE OF manager_id ON employees
+FOR EACH ROW WHEN (OLD.manager_id IS DISTINCT FROM NEW.manager_id)
+EXECUTE FUNCTION move_employee_in_hierarchy();
+
+-- Initial reporting lines: everyone reports to their department's manager, who stays at
+-- the top of the hierarchy. Managers are looked up by email, because their ids depend on
+-- the insert order above (the ids in the ratings comment are not theirs).
+UPDATE employees e
+SET manager_id = m.employee_id
+FROM (VALUES ('HR', 'jane.smith@example.com'),
+             ('Engineering', 'kiran.kumar@example.com'),
+             ('Marketing', 'ritesh.jain@example.com'),
+             ('Finance', 'suresh.patil@example.com')) AS v(department_name, email)
+JOIN departments d ON d.department_name = v.department_name
+JOIN employees m ON m.email = v.email
+WHERE e.department_id = d.department_id
+  AND e.employee_id <> m.employee_id
+  AND e.manager_id IS NULL;
+
+-- 15. Employee search indexes
+-- Trigram indexes let the substring (LIKE '%term%') search use an index scan.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_employees_name_trgm ON employees USING gin (LOWER(name) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_employees_email_trgm ON employees USING gin (LOWER(email) gin_trgm_ops);
+
+-- 16. App users and sessions
+-- Login accounts with PBKDF2 password hashes, server-side session records and
+-- per-user saved state. Any app process can resume a session, so several Streamlit
+-- workers can run behind a load balancer without sticky sessions. The page URL only
+-- carries a short-lived resume token, which is replaced every time it is used.
+CREATE TABLE IF NOT EXISTS app_users (
+    user_id SERIAL PRIMARY KEY,
+    username VARCHAR(100) NOT NULL UNIQUE,
+    password_hash TEXT NOT NULL,
+    display_name VARCHAR(100) NOT NULL,
+    employee_id INT REFERENCES employees(employee_id) ON DELETE SET NULL,
+    is_active BOOLEAN NOT NULL DEFAULT TRUE,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS app_sessions (
+    token VARCHAR(64) PRIMARY KEY,
+    user_id INT NOT NULL REFERENCES app_users(user_id) ON DELETE CASCADE,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    last_seen_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    expires_at TIMESTAMP NOT NULL,
+    resume_token VARCHAR(64) UNIQUE,
+    resume_expires_at TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_app_sessions_expires_at ON app_sessions (expires_at);
+CREATE INDEX IF NOT EXISTS idx_app_sessions_user_id ON app_sessions (user_id);
+
+CREATE TABLE IF NOT EXISTS user_state (
+    user_id INT NOT NULL REFERENCES app_users(user_id) ON DELETE CASCADE,
+    state_key VARCHAR(100) NOT NULL,
+    value JSONB NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (user_id, state_key)
+);
+
+-- The original HR login (Shreya / Nayak), now stored as a PBKDF2-SHA256 hash.
+INSERT INTO app_users (username, password_hash, display_name, employee_id)
+SELECT 'Shreya',
+       'pbkdf2_sha256$600000$5f3c9a1e7b2d4c6f8a0e1d3b5c7a9f21$d36cf37e3cd91c271fb121702c51873fa1cb335090a754df69fbee586b0b0300',
+       'Shreya', employee_id
+FROM employees WHERE email = 'shreya.nayak@example.com'
+ON CONFLICT (username) DO NOTHING;
+
+-- 17. Snapshot change tracking
+-- Incremental Parquet snapshots (snapshot_hr.py) pick up changed tasks and ratings by
+-- updated_at. Employee changes are already tracked by employee_audit.
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NOT NULL DEFAULT NOW();
+CREATE INDEX IF NOT EXISTS idx_tasks_updated_at ON tasks (updated_at);
+ALTER TABLE performance_ratings ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NOT NULL DEFAULT NOW();
+CREATE INDEX IF NOT EXISTS idx_performance_ratings_updated_at ON performance_ratings (updated_at);
+
+CREATE OR REPLACE FUNCTION touch_updated_at() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at := NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS tasks_touch_updated_at ON tasks;
+CREATE TRIGGER tasks_touch_updated_at
+BEFORE UPDATE ON tasks
+FOR EACH ROW WHEN (OLD.* IS DISTINCT FROM NEW.*)
+EXECUTE FUNCTION touch_updated_at();
+
+DROP TRIGGER IF EXISTS performance_ratings_touch_updated_at ON performance_ratings;
+CREATE TRIGGER performance_ratings_touch_updated_at
+BEFORE UPDATE ON performance_ratings
+FOR EACH ROW WHEN (OLD.* IS DISTINCT FROM NEW.*)
+EXECUTE FUNCTION touch_updated_at();
+
+-- 18. Employee archive
+-- Deleting an employee moves the full record, with their tasks and ratings, into
+-- archive tables, so the hot tables only hold current staff. Archived rows keep their
+-- ids and can be restored. The archive tables mirror the live ones column for column
+-- (plus archived_at), so columns added to employees, tasks or performance_ratings must
+-- be added to their archive table too. Rows are copied by column name both ways, so
+-- the column order may differ.
+CREATE TABLE IF NOT EXISTS archived_employees (
+    LIKE employees,
+    archived_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    archive_reason TEXT,
+    PRIMARY KEY (employee_id)
+);
+-- Matches the archive browser's keyset order, so every page is an index range scan.
+CREATE INDEX IF NOT EXISTS idx_archived_employees_archived_at ON archived_employees (archived_at DESC, employee_id DESC);
+
+CREATE TABLE IF NOT EXISTS archived_tasks (
+    LIKE tasks,
+    archived_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (task_id)
+);
+CREATE INDEX IF NOT EXISTS idx_archived_tasks_employee ON archived_tasks (employee_id);
+
+CREATE TABLE IF NOT EXISTS archived_performance_ratings (
+    LIKE performance_ratings,
+    archived_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (rating_id)
+);
+CREATE INDEX IF NOT EXISTS idx_archived_ratings_employee ON archived_performance_ratings (employee_id);
+-- For archives created before performance_ratings had updated_at.
+ALTER TABLE archived_performance_ratings ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NOT NULL DEFAULT NOW();
+
+-- Ratings an archived manager gave stay with the rated employee, and departments
+-- simply lose an archived head.
+ALTER TABLE performance_ratings DROP CONSTRAINT IF EXISTS performance_ratings_reporting_manager_id_fkey;
+ALTER TABLE departments
+DROP CONSTRAINT IF EXISTS fk_head_of_department,
+ADD CONSTRAINT fk_head_of_department
+FOREIGN KEY (head_of_department_id) REFERENCES employees(employee_id) ON DELETE SET NULL;
+
+-- Deletions are audited too, so audit-based readers (history, snapshots) see them.
+CREATE OR REPLACE FUNCTION log_employee_delete() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO employee_audit (employee_id, operation, changed_fields)
+    SELECT employee_id, 'D', '{}'::jsonb FROM deleted_rows;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS employees_audit_delete ON employees;
+CREATE TRIGGER employees_audit_delete
+AFTER DELETE ON employees
+REFERENCING OLD TABLE AS deleted_rows
+FOR EACH STATEMENT EXECUTE FUNCTION log_employee_delete();
+
+CREATE OR REPLACE FUNCTION archive_employees(p_ids INT[], p_reason TEXT DEFAULT NULL) RETURNS INT AS $$
+DECLARE
+    archived INT;
+BEGIN
+    -- Reports of archived employees move up to their nearest manager who stays.
+    UPDATE employees e
+    SET manager_id = (
+            SELECT h.ancestor_id
+            FROM employee_hierarchy h
+            WHERE h.descendant_id = e.employee_id AND h.depth > 0 AND h.ancestor_id <> ALL (p_ids)
+            ORDER BY h.depth
+            LIMIT 1
+        ),
+        row_version = row_version + 1
+    WHERE e.manager_id = ANY (p_ids) AND e.employee_id <> ALL (p_ids);
+
+    WITH moved AS (DELETE FROM tasks WHERE employee_id = ANY (p_ids) RETURNING *)
+    INSERT INTO archived_tasks
+    SELECT r.*
+    FROM moved, jsonb_populate_record(NULL::archived_tasks, to_jsonb(moved) || jsonb_build_object('archived_at', NOW())) r;
+
+    WITH moved AS (DELETE FROM performance_ratings WHERE employee_id = ANY (p_ids) RETURNING *)
+    INSERT INTO archived_performance_ratings
+    SELECT r.*
+    FROM moved, jsonb_populate_record(NULL::archived_performance_ratings, to_jsonb(moved) || jsonb_build_object('archived_at', NOW())) r;
+
+    WITH moved AS (DELETE FROM employees WHERE employee_id = ANY (p_ids) RETURNING *)
+    INSERT INTO archived_employees
+    SELECT r.*
+    FROM moved, jsonb_populate_record(
+        NULL::archived_employees, to_jsonb(moved) || jsonb_build_object('archived_at', NOW(), 'archive_reason', p_reason)
+    ) r;
+    GET DIAGNOSTICS archived = ROW_COUNT;
+    RETURN archived;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION restore_employees(p_ids INT[]) RETURNS INT AS $$
+DECLARE
+    restored INT;
+BEGIN
+    -- Rows are restored by column name, so the archive-only columns are simply dropped.
+    -- Managers are reattached afterwards, once everyone restored together exists again.
+    -- Employees archived from the old soft-delete scheme come back active.
+    INSERT INTO employees
+    SELECT r.*
+    FROM archived_employees a,
+         jsonb_populate_record(NULL::employees, to_jsonb(a) || '{"manager_id": null, "is_active": true}'::jsonb) r
+    WHERE a.employee_id = ANY (p_ids);
+    GET DIAGNOSTICS restored = ROW_COUNT;
+
+    -- Restored employees report to their old manager again if that manager is still (or again) here.
+    UPDATE employees e
+    SET manager_id = a.manager_id
+    FROM archived_employees a
+    WHERE a.employee_id = e.employee_id
+      AND a.employee_id = ANY (p_ids)
+      AND EXISTS (SELECT 1 FROM employees m WHERE m.employee_id = a.manager_id);
+
+    DELETE FROM archived_employees WHERE employee_id = ANY (p_ids);
+
+    -- Restored tasks and ratings count as changed now, so incremental snapshots export them again.
+    WITH moved AS (DELETE FROM archived_tasks WHERE employee_id = ANY (p_ids) RETURNING *)
+    INSERT INTO tasks
+    SELECT r.*
+    FROM moved, jsonb_populate_record(NULL::tasks, to_jsonb(moved) || jsonb_build_object('updated_at', NOW())) r;
+
+    WITH moved AS (DELETE FROM archived_performance_ratings WHERE employee_id = ANY (p_ids) RETURNING *)
+    INSERT INTO performance_ratings
+    SELECT r.*
+    FROM moved, jsonb_populate_record(NULL::performance_ratings, to_jsonb(moved) || jsonb_build_object('updated_at', NOW())) r;
+    RETURN restored;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Employees soft-deleted before the archive existed are archived now, keeping their
+-- original deletion date; deleted_employees becomes a read-only view of the archive.
+SELECT archive_employees(ARRAY(SELECT employee_id FROM employees WHERE is_active = FALSE), 'Deleted before archiving');
+
+DO $$
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = to_regclass('deleted_employees')) = 'r' THEN
+        UPDATE archived_employees a
+        SET archived_at = d.deletion_date
+        FROM deleted_employees d
+        WHERE d.employee_id = a.employee_id AND d.deletion_date IS NOT NULL;
+        DROP TABLE deleted_employees;
+    END IF;
+END;
+$$;
+
+CREATE OR REPLACE VIEW deleted_employees AS
+SELECT employee_id, name, email, archived_at AS deletion_date
+FROM archived_employees;
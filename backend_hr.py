@@ -1,5 +1,16 @@
+import functools
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from contextvars import ContextVar
+
 import psycopg2
-import pandas as pd
+from datetime import datetime
+from decimal import Decimal
+from psycopg2 import sql
+from psycopg2.extras import Json
 from typing import List, Dict
 
 # --- Database Connection and Configuration ---
@@ -11,20 +22,345 @@ DB_CONFIG = {
     "port": "5432"
 }
 
+# Optional streaming replica for the functions tagged with @reads, e.g.
+# READ_DB_CONFIG = dict(DB_CONFIG, port="5433"). None sends everything to the primary.
+READ_DB_CONFIG = None
+MAX_REPLICA_LAG_SECONDS = 5
+
+_db_route = ContextVar("db_route", default="write")
+_write_position = ContextVar("write_position", default=None)
+
+class WritePosition:
+    """The primary's WAL position after one user session's latest commit."""
+
+    def __init__(self):
+        self.lsn = 0
+
+def bind_write_position(position):
+    """Makes the current thread's reads wait for the replica to reach `position`, and its commits advance it.
+
+    The frontend binds one WritePosition per user session, so a user sees their own writes
+    without every other user's reads being pushed to the primary.
+    """
+    _write_position.set(position)
+
+def reads(func):
+    """Tags a backend function as read-only so its queries may be served by the replica."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _db_route.set("read")
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _db_route.reset(token)
+    return wrapper
+
+def writes(func):
+    """Tags a backend function as writing, which always routes it to the primary."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _db_route.set("write")
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _db_route.reset(token)
+    return wrapper
+
+def _lsn_to_int(lsn):
+    high, low = lsn.split("/")
+    return (int(high, 16) << 32) | int(low, 16)
+
+def _commit(conn, employees_changed=False):
+    """Commits and advances the session's write position so its later reads see this write.
+
+    Writes that change employee rows pass `employees_changed`, which drops the chart series
+    built from them.
+    """
+    conn.commit()
+    if employees_changed:
+        clear_chart_cache()
+    position = _write_position.get()
+    if not READ_DB_CONFIG or position is None:
+        return
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT pg_current_wal_lsn()")
+        lsn = _lsn_to_int(cursor.fetchone()[0])
+        conn.rollback()
+    finally:
+        cursor.close()
+    position.lsn = max(position.lsn, lsn)
+
+def _connect_replica():
+    """Returns a replica connection, or None if it is unreachable, lagging or behind the session's last write."""
+    try:
+        conn = psycopg2.connect(**READ_DB_CONFIG, connect_timeout=2)
+    except psycopg2.Error as e:
+        print(f"Read replica unavailable: {e}")
+        return None
+    position = _write_position.get()
+    last_write = position.lsn if position is not None else 0
+    cursor = conn.cursor()
+    try:
+        # An idle primary sends no new WAL, so a fully replayed replica counts as zero lag.
+        cursor.execute("""
+            SELECT NOT pg_is_in_recovery()
+                OR (pg_last_wal_replay_lsn() - '0/0'::pg_lsn >= %s
+                    AND (pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()
+                         OR now() - pg_last_xact_replay_timestamp() <= %s * INTERVAL '1 second'))
+        """, (last_write, MAX_REPLICA_LAG_SECONDS))
+        usable = cursor.fetchone()[0]
+        conn.rollback()
+    except psycopg2.Error as e:
+        print(f"Read replica check failed: {e}")
+        usable = False
+    finally:
+        cursor.close()
+    if usable:
+        return conn
+    conn.close()
+    return None
+
 def get_db_connection():
-    """Establishes and returns a database connection."""
+    """Establishes and returns a database connection.
+
+    Functions tagged with @reads use the read replica when one is configured and it is
+    caught up; everything else, and any read the replica cannot serve, uses the primary.
+    """
+    if READ_DB_CONFIG and _db_route.get() == "read":
+        conn = _connect_replica()
+        if conn is not None:
+            return conn
     conn = psycopg2.connect(**DB_CONFIG)
     return conn
 
+def get_read_connection():
+    """Returns (connection, config) for bulk readers such as reports and snapshots.
+
+    The replica is used under the same conditions as for @reads functions. `config` lets
+    the caller open more connections, e.g. from worker processes, to the same server.
+    """
+    if READ_DB_CONFIG:
+        conn = _connect_replica()
+        if conn is not None:
+            return conn, READ_DB_CONFIG
+    return psycopg2.connect(**DB_CONFIG), DB_CONFIG
+
 # --- Authentication ---
+PASSWORD_HASH_ITERATIONS = 600000
+SESSION_TTL_HOURS = 12
+RESUME_TOKEN_TTL_MINUTES = 10
+
+def hash_password(password, salt=None, iterations=PASSWORD_HASH_ITERATIONS):
+    """Returns a 'pbkdf2_sha256$iterations$salt$hash' string for storing in app_users."""
+    salt = salt or secrets.token_bytes(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+    return f"pbkdf2_sha256${iterations}${salt.hex()}${digest.hex()}"
+
+def verify_password(password, password_hash):
+    """Checks a password against a stored hash in constant time."""
+    try:
+        algorithm, iterations, salt, _ = password_hash.split("$")
+    except ValueError:
+        return False
+    if algorithm != "pbkdf2_sha256":
+        return False
+    return hmac.compare_digest(hash_password(password, bytes.fromhex(salt), int(iterations)), password_hash)
+
+def _user_from_row(row):
+    return {"user_id": row[0], "username": row[1], "display_name": row[2], "employee_id": row[3]}
+
+@writes
+def create_user(username, password, display_name, employee_id=None):
+    """Adds a login account and returns its user_id, or None if the username is taken."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            INSERT INTO app_users (username, password_hash, display_name, employee_id)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (username) DO NOTHING
+            RETURNING user_id
+            """,
+            (username, hash_password(password), display_name, employee_id)
+        )
+        row = cursor.fetchone()
+        _commit(conn)
+        return row[0] if row else None
+    except psycopg2.Error as e:
+        print(f"Database error: {e}")
+        conn.rollback()
+        return None
+    finally:
+        cursor.close()
+        conn.close()
+
+@reads
 def authenticate_user(username, password):
-    """Authenticates the HR user."""
-    # Hardcoded for simplicity as per request
-    return username == "Shreya" and password == "Nayak"
+    """Returns the user record for valid credentials of an active account, otherwise None."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "SELECT user_id, username, display_name, employee_id, password_hash FROM app_users WHERE username = %s AND is_active",
+            (username,)
+        )
+        row = cursor.fetchone()
+        if row and verify_password(password, row[4]):
+            return _user_from_row(row)
+        return None
+    except psycopg2.Error as e:
+        print(f"Database error: {e}")
+        return None
+    finally:
+        cursor.close()
+        conn.close()
+
+# Session bookkeeping leaves HR data untouched, so it commits directly rather than
+# through _commit() and does not invalidate the chart cache on every login.
+@writes
+def create_session(user_id):
+    """Starts a server-side session for the user and returns its token."""
+    token = secrets.token_urlsafe(32)
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        # Expired sessions are cleaned up as new ones are created.
+        cursor.execute("DELETE FROM app_sessions WHERE expires_at < NOW()")
+        cursor.execute(
+            "INSERT INTO app_sessions (token, user_id, expires_at) VALUES (%s, %s, NOW() + %s * INTERVAL '1 hour')",
+            (token, user_id, SESSION_TTL_HOURS)
+        )
+        conn.commit()
+        return token
+    except psycopg2.Error as e:
+        print(f"Database error: {e}")
+        conn.rollback()
+        return None
+    finally:
+        cursor.close()
+        conn.close()
+
+@writes
+def issue_resume_token(token):
+    """Returns a new single-use resume token for a live session and extends the session, or None if it has ended.
+
+    Only the resume token is put in the page URL; the session token itself stays on the server.
+    Issuing a new one invalidates the previous one.
+    """
+    resume_token = secrets.token_urlsafe(32)
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            UPDATE app_sessions
+            SET resume_token = %s, resume_expires_at = NOW() + %s * INTERVAL '1 minute',
+                last_seen_at = NOW(), expires_at = NOW() + %s * INTERVAL '1 hour'
+            WHERE token = %s AND expires_at > NOW()
+            """,
+            (resume_token, RESUME_TOKEN_TTL_MINUTES, SESSION_TTL_HOURS, token)
+        )
+        found = cursor.rowcount == 1
+        conn.commit()
+        return resume_token if found else None
+    except psycopg2.Error as e:
+        print(f"Database error: {e}")
+        conn.rollback()
+        return None
+    finally:
+        cursor.close()
+        conn.close()
+
+@writes
+def resume_session(resume_token):
+    """Consumes a resume token and returns (user, session token), or (None, None) if it is used up or expired."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            UPDATE app_sessions s
+            SET resume_token = NULL, resume_expires_at = NULL, last_seen_at = NOW()
+            FROM app_users u
+            WHERE s.resume_token = %s AND s.resume_expires_at > NOW() AND s.expires_at > NOW()
+              AND u.user_id = s.user_id AND u.is_active
+            RETURNING s.token, u.user_id, u.username, u.display_name, u.employee_id
+            """,
+            (resume_token,)
+        )
+        row = cursor.fetchone()
+        conn.commit()
+        return (_user_from_row(row[1:]), row[0]) if row else (None, None)
+    except psycopg2.Error as e:
+        print(f"Database error: {e}")
+        conn.rollback()
+        return None, None
+    finally:
+        cursor.close()
+        conn.close()
+
+@writes
+def delete_session(token):
+    """Ends a session, e.g. on logout."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM app_sessions WHERE token = %s", (token,))
+        conn.commit()
+        return True
+    except psycopg2.Error as e:
+        print(f"Database error: {e}")
+        conn.rollback()
+        return False
+    finally:
+        cursor.close()
+        conn.close()
+
+@reads
+def get_user_state(user_id, key, default=None):
+    """Returns a value the user saved under `key`, or `default` if there is none."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT value FROM user_state WHERE user_id = %s AND state_key = %s", (user_id, key))
+        row = cursor.fetchone()
+        return row[0] if row else default
+    except psycopg2.Error as e:
+        print(f"Database error: {e}")
+        return default
+    finally:
+        cursor.close()
+        conn.close()
+
+@writes
+def set_user_state(user_id, key, value):
+    """Saves a JSON-serialisable value for the user, replacing any earlier value."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            INSERT INTO user_state (user_id, state_key, value) VALUES (%s, %s, %s)
+            ON CONFLICT (user_id, state_key) DO UPDATE SET value = EXCLUDED.value, updated_at = NOW()
+            """,
+            (user_id, key, Json(value))
+        )
+        _commit(conn)
+        return True
+    except psycopg2.Error as e:
+        print(f"Database error: {e}")
+        conn.rollback()
+        return False
+    finally:
+        cursor.close()
+        conn.close()
 
 # --- Employee Management (CRUD) ---
 
 # C - Create
+@writes
 def create_employee(employee_data):
     """Adds a new employee to the database."""
     conn = get_db_connection()
@@ -39,7 +375,7 @@ def create_employee(employee_data):
             employee_data['department_id'], employee_data['job_title'], employee_data['salary'],
             employee_data['hire_date'], employee_data['gender'], employee_data['profile_photo']
         ))
-        conn.commit()
+        _commit(conn, employees_changed=True)
         return True
     except psycopg2.Error as e:
         print(f"Database error: {e}")
@@ -50,14 +386,15 @@ def create_employee(employee_data):
         conn.close()
 
 # R - Read
+@reads
 def get_all_employees():
     """Fetches all employees and their department names."""
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
         query = """
-        SELECT e.employee_id, e.name, e.email, e.phone, d.department_name,
-               e.job_title, e.salary, e.hire_date, e.gender, e.profile_photo
+        SELECT e.employee_id, e.name, e.email, e.phone, e.department_id, d.department_name,
+               e.job_title, e.salary, e.hire_date, e.gender, e.profile_photo, e.manager_id, e.row_version
         FROM employees e
         JOIN departments d ON e.department_id = d.department_id
         WHERE e.is_active = TRUE
@@ -80,20 +417,23 @@ def get_all_employees():
         cursor.close()
         conn.close()
 
+@reads
 def search_employees(search_term):
     """Searches employees by name or email."""
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
         query = """
-        SELECT e.employee_id, e.name, e.email, e.phone, d.department_name,
-               e.job_title, e.salary, e.hire_date, e.gender, e.profile_photo
+        SELECT e.employee_id, e.name, e.email, e.phone, e.department_id, d.department_name,
+               e.job_title, e.salary, e.hire_date, e.gender, e.profile_photo, e.manager_id, e.row_version
         FROM employees e
         JOIN departments d ON e.department_id = d.department_id
         WHERE (LOWER(e.name) LIKE %s OR LOWER(e.email) LIKE %s)
           AND e.is_active = TRUE;
         """
-        search_term = f"%{search_term.lower()}%"
+        # Escape LIKE wildcards so the term is matched literally.
+        search_term = search_term.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        search_term = f"%{search_term}%"
         cursor.execute(query, (search_term, search_term))
         columns = [desc[0] for desc in cursor.description]
         employees = cursor.fetchall()
@@ -111,6 +451,7 @@ def search_employees(search_term):
         conn.close()
 
 # U - Update
+@writes
 def update_employee(employee_id, employee_data):
     """Updates an existing employee's details."""
     conn = get_db_connection()
@@ -119,7 +460,7 @@ def update_employee(employee_id, employee_data):
         query = """
         UPDATE employees
         SET name = %s, email = %s, phone = %s, department_id = %s, job_title = %s, salary = %s,
-            hire_date = %s, gender = %s, profile_photo = %s
+            hire_date = %s, gender = %s, profile_photo = %s, row_version = row_version + 1
         WHERE employee_id = %s
         """
         cursor.execute(query, (
@@ -127,7 +468,7 @@ def update_employee(employee_id, employee_data):
             employee_data['department_id'], employee_data['job_title'], employee_data['salary'],
             employee_data['hire_date'], employee_data['gender'], employee_data['profile_photo'], employee_id
         ))
-        conn.commit()
+        _commit(conn, employees_changed=True)
         return True
     except psycopg2.Error as e:
         print(f"Database error: {e}")
@@ -137,51 +478,173 @@ def update_employee(employee_id, employee_data):
         cursor.close()
         conn.close()
 
-# D - Delete
-def delete_employee(employee_id):
-    """Soft-deletes an employee and moves their info to a 'deleted' table."""
+# Columns the employee forms can change.
+EMPLOYEE_FIELDS = ['name', 'email', 'phone', 'department_id', 'job_title', 'salary', 'hire_date', 'gender', 'profile_photo',
+                   'manager_id']
+
+# Outcomes of update_employee_fields()
+UPDATE_APPLIED = 'updated'
+UPDATE_UNCHANGED = 'unchanged'
+UPDATE_CONFLICT = 'conflict'
+UPDATE_FAILED = 'failed'
+
+def _normalize_field(field, value):
+    """Brings form and database values to a common form so they can be compared."""
+    if value == '':
+        return None
+    if field == 'salary' and value is not None:
+        return Decimal(str(value)).quantize(Decimal('0.01'))
+    if field == 'hire_date' and isinstance(value, datetime):
+        return value.date()
+    return value
+
+def get_changed_fields(original, updated):
+    """Returns the fields of `updated` whose values differ from the loaded `original` record."""
+    return {
+        field: updated[field] for field in EMPLOYEE_FIELDS
+        if field in updated and _normalize_field(field, updated[field]) != _normalize_field(field, original.get(field))
+    }
+
+@writes
+def update_employee_fields(employee_id, original, updated):
+    """Writes only the fields that changed since `original` was loaded.
+
+    `original` must carry the row_version it was read with; the update is rejected
+    with UPDATE_CONFLICT if another editor saved the employee in the meantime.
+    """
+    changes = get_changed_fields(original, updated)
+    if not changes:
+        return UPDATE_UNCHANGED
+
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
-        # Get employee info for the deleted_employees table
-        cursor.execute("SELECT name, email FROM employees WHERE employee_id = %s", (employee_id,))
-        employee_info = cursor.fetchone()
-        if not employee_info:
-            return False
+        query = sql.SQL("""
+        UPDATE employees
+        SET {}, row_version = row_version + 1
+        WHERE employee_id = %s AND row_version = %s
+        """).format(sql.SQL(', ').join(sql.SQL("{} = %s").format(sql.Identifier(field)) for field in changes))
+        cursor.execute(query, list(changes.values()) + [employee_id, original['row_version']])
+        if cursor.rowcount == 0:
+            conn.rollback()
+            return UPDATE_CONFLICT
+        _commit(conn, employees_changed=True)
+        return UPDATE_APPLIED
+    except psycopg2.Error as e:
+        print(f"Database error: {e}")
+        conn.rollback()
+        return UPDATE_FAILED
+    finally:
+        cursor.close()
+        conn.close()
 
-        name, email = employee_info
+# D - Delete
+@writes
+def delete_employee(employee_id, reason=None):
+    """Archives an employee with their tasks and ratings; their reports move up to the next manager."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT archive_employees(%s, %s)", ([employee_id], reason))
+        (archived,) = cursor.fetchone()
+        _commit(conn, employees_changed=True)
+        return archived == 1
+    except psycopg2.Error as e:
+        print(f"Database error: {e}")
+        conn.rollback()
+        return False
+    finally:
+        cursor.close()
+        conn.close()
 
-        # Insert into deleted_employees table
-        cursor.execute("INSERT INTO deleted_employees (employee_id, name, email) VALUES (%s, %s, %s)",
-                       (employee_id, name, email))
+# --- Employee Archive ---
+ARCHIVE_BATCH_SIZE = 1000
 
-        # Soft delete from the main employees table
-        cursor.execute("UPDATE employees SET is_active = FALSE WHERE employee_id = %s", (employee_id,))
+@writes
+def archive_inactive_employees(batch_size=ARCHIVE_BATCH_SIZE):
+    """Archives employees still marked inactive in batches and returns how many were moved.
 
-        conn.commit()
-        return True
+    Each batch is its own transaction, so a large backlog never holds long locks.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    total = 0
+    try:
+        while True:
+            cursor.execute(
+                """
+                SELECT archive_employees(
+                    ARRAY(SELECT employee_id FROM employees WHERE is_active = FALSE ORDER BY employee_id LIMIT %s),
+                    'Inactive'
+                )
+                """,
+                (batch_size,)
+            )
+            (archived,) = cursor.fetchone()
+            _commit(conn, employees_changed=True)
+            total += archived
+            if archived < batch_size:
+                return total
     except psycopg2.Error as e:
         print(f"Database error: {e}")
         conn.rollback()
-        return False
+        return total
     finally:
         cursor.close()
         conn.close()
 
-def get_deleted_employees():
-    """Fetches a list of soft-deleted employees."""
+@reads
+def get_archived_employees(after=None, page_size=50):
+    """Fetches one page of archived employees, most recently archived first.
+
+    `after` is the cursor returned with the previous page. Returns (rows, next_cursor);
+    next_cursor is None on the last page. Pages are keyset-paginated on
+    (archived_at, employee_id), so deep pages cost the same as the first.
+    """
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
-        cursor.execute("SELECT employee_id, name, email, deletion_date FROM deleted_employees ORDER BY deletion_date DESC;")
+        query = """
+        SELECT a.employee_id, a.name, a.email, d.department_name, a.job_title, a.hire_date,
+               a.archived_at, a.archive_reason,
+               (SELECT COUNT(*) FROM archived_tasks t WHERE t.employee_id = a.employee_id) AS tasks,
+               (SELECT COUNT(*) FROM archived_performance_ratings r WHERE r.employee_id = a.employee_id) AS ratings
+        FROM archived_employees a
+        LEFT JOIN departments d ON a.department_id = d.department_id
+        WHERE %s IS NULL OR (a.archived_at, a.employee_id) < (%s, %s)
+        ORDER BY a.archived_at DESC, a.employee_id DESC
+        LIMIT %s;
+        """
+        archived_at, employee_id = after or (None, None)
+        cursor.execute(query, (archived_at, archived_at, employee_id, page_size))
         columns = [desc[0] for desc in cursor.description]
-        deleted_employees = cursor.fetchall()
-        return [dict(zip(columns, row)) for row in deleted_employees]
+        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        next_cursor = (rows[-1]['archived_at'], rows[-1]['employee_id']) if len(rows) == page_size else None
+        return rows, next_cursor
+    finally:
+        cursor.close()
+        conn.close()
+
+@writes
+def restore_employees(employee_ids):
+    """Moves archived employees, with their tasks and ratings, back; returns the number restored or None on error."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT restore_employees(%s)", (list(employee_ids),))
+        (restored,) = cursor.fetchone()
+        _commit(conn, employees_changed=True)
+        return restored
+    except psycopg2.Error as e:
+        print(f"Database error: {e}")
+        conn.rollback()
+        return None
     finally:
         cursor.close()
         conn.close()
 
 # --- Task Management ---
+@reads
 def get_tasks_by_due_date():
     """Fetches all tasks, ordered by due date."""
     conn = get_db_connection()
@@ -201,6 +664,78 @@ def get_tasks_by_due_date():
         cursor.close()
         conn.close()
 
+@reads
+def get_employee_tasks(employee_id):
+    """Fetches one employee's tasks, ordered by due date."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        query = """
+        SELECT task_id, task_description, due_date, status
+        FROM tasks
+        WHERE employee_id = %s
+        ORDER BY due_date;
+        """
+        cursor.execute(query, (employee_id,))
+        columns = [desc[0] for desc in cursor.description]
+        tasks = cursor.fetchall()
+        return [dict(zip(columns, row)) for row in tasks]
+    finally:
+        cursor.close()
+        conn.close()
+
+TASK_BUCKETS = ['Overdue', 'Due This Week', 'Later']
+
+# Bucket filters are written as due_date ranges so they can use idx_tasks_status_due_date.
+_TASK_BUCKET_FILTERS = {
+    'Overdue': "due_date < CURRENT_DATE",
+    'Due This Week': "due_date >= CURRENT_DATE AND due_date < CURRENT_DATE + 7",
+    'Later': "(due_date >= CURRENT_DATE + 7 OR due_date IS NULL)",
+}
+
+@reads
+def get_task_schedule_summary():
+    """Counts open tasks per due-date bucket, employee and status."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        query = """
+        SELECT bucket, employee_id, employee_name, status, COUNT(*) AS task_count
+        FROM task_schedule
+        GROUP BY bucket, employee_id, employee_name, status
+        ORDER BY employee_name, status;
+        """
+        cursor.execute(query)
+        columns = [desc[0] for desc in cursor.description]
+        summary = cursor.fetchall()
+        return [dict(zip(columns, row)) for row in summary]
+    finally:
+        cursor.close()
+        conn.close()
+
+@reads
+def get_task_schedule_page(bucket=None, page=0, page_size=25):
+    """Fetches one page of open tasks ordered by due date, optionally limited to a bucket."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        where_clause = f"WHERE {_TASK_BUCKET_FILTERS[bucket]}" if bucket else ""
+        query = f"""
+        SELECT task_id, employee_name, task_description, due_date, status, bucket
+        FROM task_schedule
+        {where_clause}
+        ORDER BY due_date NULLS LAST, task_id
+        LIMIT %s OFFSET %s;
+        """
+        cursor.execute(query, (page_size, page * page_size))
+        columns = [desc[0] for desc in cursor.description]
+        tasks = cursor.fetchall()
+        return [dict(zip(columns, row)) for row in tasks]
+    finally:
+        cursor.close()
+        conn.close()
+
+@writes
 def assign_task(employee_id, task_description, due_date):
     """Assigns a task to an employee."""
     conn = get_db_connection()
@@ -210,7 +745,7 @@ def assign_task(employee_id, task_description, due_date):
             "INSERT INTO tasks (employee_id, task_description, due_date) VALUES (%s, %s, %s)",
             (employee_id, task_description, due_date)
         )
-        conn.commit()
+        _commit(conn)
         return True
     except psycopg2.Error as e:
         print(f"Database error: {e}")
@@ -220,6 +755,7 @@ def assign_task(employee_id, task_description, due_date):
         cursor.close()
         conn.close()
 
+@writes
 def update_task_status(task_id, new_status):
     """Updates the status of a task."""
     conn = get_db_connection()
@@ -229,7 +765,7 @@ def update_task_status(task_id, new_status):
             "UPDATE tasks SET status = %s WHERE task_id = %s",
             (new_status, task_id)
         )
-        conn.commit()
+        _commit(conn)
         return True
     except psycopg2.Error as e:
         print(f"Database error: {e}")
@@ -240,6 +776,7 @@ def update_task_status(task_id, new_status):
         conn.close()
 
 # --- Business Insights ---
+@reads
 def get_business_insights():
     """Calculates and returns various business insights."""
     conn = get_db_connection()
@@ -295,6 +832,114 @@ def get_business_insights():
         cursor.close()
         conn.close()
 
+# --- Chart Data ---
+# Charts receive pre-aggregated series from SQL, capped at MAX_CHART_POINTS points,
+# so the payload sent to the browser stays the same size at any headcount.
+MAX_CHART_POINTS = 60
+# The cache lives in each app process. Employee writes clear it only in the process that
+# made them; other processes (e.g. several Streamlit workers behind a load balancer) keep
+# serving their copy until it is CHART_CACHE_SECONDS old.
+CHART_CACHE_SECONDS = 300
+
+_chart_cache = {}
+_chart_cache_lock = threading.Lock()
+
+def clear_chart_cache():
+    """Drops this process's cached chart series; called after writes that change employees."""
+    with _chart_cache_lock:
+        _chart_cache.clear()
+
+def _cached_chart(key, compute):
+    now = time.monotonic()
+    with _chart_cache_lock:
+        cached = _chart_cache.get(key)
+    if cached and now - cached[0] < CHART_CACHE_SECONDS:
+        return cached[1]
+    series = compute()
+    with _chart_cache_lock:
+        _chart_cache[key] = (now, series)
+    return series
+
+@reads
+def get_salary_histogram(bins=20):
+    """Counts active employees per equal-width salary bin between the lowest and highest salary."""
+    bins = max(1, min(bins, MAX_CHART_POINTS))
+
+    def compute():
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                WITH bounds AS (
+                    SELECT MIN(salary) AS low, MAX(salary) AS high
+                    FROM employees
+                    WHERE is_active = TRUE
+                )
+                SELECT width_bucket(e.salary, b.low, b.high + 0.01, %s) AS bucket, COUNT(*), b.low, b.high
+                FROM employees e, bounds b
+                WHERE e.is_active = TRUE AND e.salary IS NOT NULL
+                GROUP BY bucket, b.low, b.high
+                ORDER BY bucket;
+            """, (bins,))
+            rows = cursor.fetchall()
+            if not rows:
+                return []
+            low, high = float(rows[0][2]), float(rows[0][3]) + 0.01
+            width = (high - low) / bins
+            counts = {bucket: count for bucket, count, _, _ in rows}
+            return [
+                {"bin_start": round(low + i * width, 2), "bin_end": round(low + (i + 1) * width, 2),
+                 "count": counts.get(i + 1, 0)}
+                for i in range(bins)
+            ]
+        finally:
+            cursor.close()
+            conn.close()
+
+    return _cached_chart(("salary_histogram", bins), compute)
+
+@reads
+def get_hiring_trend():
+    """Counts hires per period, using the finest of month/quarter/year that fits MAX_CHART_POINTS."""
+    def compute():
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT (date_part('year', MAX(hire_date)) - date_part('year', MIN(hire_date))) * 12
+                       + date_part('month', MAX(hire_date)) - date_part('month', MIN(hire_date)) + 1
+                FROM employees
+                WHERE is_active = TRUE;
+            """)
+            months = cursor.fetchone()[0]
+            if not months:
+                return []
+            if months <= MAX_CHART_POINTS:
+                grain = 'month'
+            elif months <= MAX_CHART_POINTS * 3:
+                grain = 'quarter'
+            else:
+                grain = 'year'
+
+            cursor.execute("""
+                SELECT period, hires, (SUM(hires) OVER (ORDER BY period))::int AS cumulative_hires
+                FROM (
+                    SELECT date_trunc(%s, hire_date)::date AS period, COUNT(*) AS hires
+                    FROM employees
+                    WHERE is_active = TRUE AND hire_date IS NOT NULL
+                    GROUP BY period
+                ) per_period
+                ORDER BY period;
+            """, (grain,))
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row), grain=grain) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+            conn.close()
+
+    return _cached_chart(("hiring_trend",), compute)
+
+@reads
 def get_departments():
     """Fetches all departments and ensures department names are title-cased."""
     conn = get_db_connection()
@@ -308,6 +953,7 @@ def get_departments():
         conn.close()
 
 
+@reads
 def get_hr_employees():
     """Fetches all employees from the HR department."""
     conn = get_db_connection()
@@ -320,16 +966,19 @@ def get_hr_employees():
         conn.close()
 
 # --- Performance Management ---
+@reads
 def get_all_ratings():
     """Fetches all employee ratings and feedback."""
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
         query = """
-        SELECT pr.rating_id, e.name AS employee_name, rm.name AS reporting_manager_name, pr.rating, pr.feedback, pr.rating_date
+        SELECT pr.rating_id, e.name AS employee_name, COALESCE(rm.name, arm.name) AS reporting_manager_name,
+               pr.rating, pr.feedback, pr.rating_date
         FROM performance_ratings pr
         JOIN employees e ON pr.employee_id = e.employee_id
-        JOIN employees rm ON pr.reporting_manager_id = rm.employee_id
+        LEFT JOIN employees rm ON pr.reporting_manager_id = rm.employee_id
+        LEFT JOIN archived_employees arm ON pr.reporting_manager_id = arm.employee_id
         ORDER BY pr.rating_date DESC;
         """
         cursor.execute(query)
@@ -340,6 +989,7 @@ def get_all_ratings():
         cursor.close()
         conn.close()
 
+@reads
 def get_employee_ratings(employee_id):
     """Fetches ratings for a specific employee."""
     conn = get_db_connection()
@@ -358,6 +1008,7 @@ def get_employee_ratings(employee_id):
         cursor.close()
         conn.close()
 
+@writes
 def give_rating_to_employee(employee_id, manager_id, rating, feedback):
     """Gives a performance rating to an employee."""
     conn = get_db_connection()
@@ -367,7 +1018,28 @@ def give_rating_to_employee(employee_id, manager_id, rating, feedback):
             "INSERT INTO performance_ratings (employee_id, reporting_manager_id, rating, feedback, rating_date) VALUES (%s, %s, %s, %s, NOW())",
             (employee_id, manager_id, rating, feedback)
         )
-        conn.commit()
+        _commit(conn)
+        return True
+    except psycopg2.Error as e:
+        print(f"Database error: {e}")
+        conn.rollback()
+        return False
+    finally:
+        cursor.close()
+        conn.close()
+
+# --- Audit History ---
+@writes
+def ensure_audit_partitions(months_ahead=2):
+    """Creates the monthly employee_audit partitions for this month and the next few."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "SELECT create_employee_audit_partition((CURRENT_DATE + m * INTERVAL '1 month')::date) FROM generate_series(0, %s) m",
+            (months_ahead,)
+        )
+        _commit(conn)
         return True
     except psycopg2.Error as e:
         print(f"Database error: {e}")
@@ -375,4 +1047,138 @@ def give_rating_to_employee(employee_id, manager_id, rating, feedback):
         return False
     finally:
         cursor.close()
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+@reads
+def get_employee_history(employee_id):
+    """Fetches the audit trail of an employee, oldest change first."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        query = """
+        SELECT audit_id, operation, changed_fields, changed_at
+        FROM employee_audit
+        WHERE employee_id = %s
+        ORDER BY changed_at, audit_id;
+        """
+        cursor.execute(query, (employee_id,))
+        columns = [desc[0] for desc in cursor.description]
+        history = cursor.fetchall()
+        return [dict(zip(columns, row)) for row in history]
+    finally:
+        cursor.close()
+        conn.close()
+
+@reads
+def get_employees_as_of(employee_ids, as_of):
+    """Reconstructs employee records as they were at `as_of`, for many employees in one query.
+
+    Returns a dict of employee_id -> record; employees that did not exist yet, or had
+    been deleted by then, are omitted.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        query = """
+        SELECT employee_id, jsonb_merge_agg(changed_fields ORDER BY changed_at, audit_id)
+        FROM employee_audit
+        WHERE employee_id = ANY(%s) AND changed_at <= %s
+        GROUP BY employee_id
+        HAVING (array_agg(operation ORDER BY changed_at DESC, audit_id DESC))[1] <> 'D';
+        """
+        cursor.execute(query, (list(employee_ids), as_of))
+        return dict(cursor.fetchall())
+    finally:
+        cursor.close()
+        conn.close()
+
+
+# --- Org Hierarchy ---
+@reads
+def get_reports(manager_id, direct_only=False):
+    """Fetches everyone reporting to a manager, directly or through the chain below them."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        query = """
+        SELECT e.employee_id, e.name, e.job_title, h.depth
+        FROM employee_hierarchy h
+        JOIN employees e ON e.employee_id = h.descendant_id
+        WHERE h.ancestor_id = %s AND h.depth BETWEEN 1 AND %s AND e.is_active = TRUE
+        ORDER BY h.depth, e.name;
+        """
+        cursor.execute(query, (manager_id, 1 if direct_only else 2147483647))
+        columns = [desc[0] for desc in cursor.description]
+        reports = cursor.fetchall()
+        return [dict(zip(columns, row)) for row in reports]
+    finally:
+        cursor.close()
+        conn.close()
+
+@reads
+def get_management_chain(employee_id):
+    """Fetches the managers above an employee, starting with their direct manager."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        query = """
+        SELECT e.employee_id, e.name, e.job_title, h.depth
+        FROM employee_hierarchy h
+        JOIN employees e ON e.employee_id = h.ancestor_id
+        WHERE h.descendant_id = %s AND h.depth > 0
+        ORDER BY h.depth;
+        """
+        cursor.execute(query, (employee_id,))
+        columns = [desc[0] for desc in cursor.description]
+        chain = cursor.fetchall()
+        return [dict(zip(columns, row)) for row in chain]
+    finally:
+        cursor.close()
+        conn.close()
+
+@reads
+def get_team_rating_rollup(manager_id=None):
+    """Averages ratings over each manager's whole reporting subtree (or a single manager's)."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        query = """
+        SELECT m.employee_id AS manager_id, m.name AS manager_name,
+               COUNT(DISTINCT h.descendant_id) AS team_size,
+               COUNT(pr.rating_id) AS ratings,
+               ROUND(AVG(pr.rating), 2) AS avg_rating
+        FROM employee_hierarchy h
+        JOIN employees m ON m.employee_id = h.ancestor_id
+        JOIN employees e ON e.employee_id = h.descendant_id
+        LEFT JOIN performance_ratings pr ON pr.employee_id = h.descendant_id
+        WHERE h.depth > 0 AND e.is_active = TRUE AND (%s IS NULL OR h.ancestor_id = %s)
+        GROUP BY m.employee_id, m.name
+        ORDER BY team_size DESC, m.name;
+        """
+        cursor.execute(query, (manager_id, manager_id))
+        columns = [desc[0] for desc in cursor.description]
+        rollup = cursor.fetchall()
+        return [dict(zip(columns, row)) for row in rollup]
+    finally:
+        cursor.close()
+        conn.close()
+
+@writes
+def set_manager(employee_id, manager_id):
+    """Moves an employee (and everyone below them) under a new manager, or to the top if None."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "UPDATE employees SET manager_id = %s, row_version = row_version + 1 WHERE employee_id = %s",
+            (manager_id, employee_id)
+        )
+        _commit(conn)
+        return True
+    except psycopg2.Error as e:
+        print(f"Database error: {e}")
+        conn.rollback()
+        return False
+    finally:
+        cursor.close()
+        conn.close()
@@ -0,0 +1,94 @@
+"""Measures the write overhead of the employee audit triggers on the bulk update path.
+
+Each run updates the same rows twice, once with the audit triggers disabled and
+once with them enabled, and reports time, WAL volume and audit bytes. Every run
+is rolled back, so it can be repeated. Use a scratch database (see bench_reports.py):
+
+    python bench_audit.py --dbname pms_bench --rows 100000
+"""
+import argparse
+import time
+
+import psycopg2
+import backend_hr as db
+
+BULK_UPDATE = """
+UPDATE employees SET salary = salary + 1, phone = '999-999-9999'
+WHERE employee_id IN (SELECT employee_id FROM employees ORDER BY employee_id LIMIT %s)
+"""
+
+
+def measure(conn, rows, audited):
+    """Runs one bulk update inside a rolled-back transaction and returns its cost."""
+    cursor = conn.cursor()
+    try:
+        if not audited:
+            cursor.execute("ALTER TABLE employees DISABLE TRIGGER employees_audit_update")
+        cursor.execute("SELECT COALESCE(MAX(audit_id), 0) FROM employee_audit")
+        (last_audit_id,) = cursor.fetchone()
+        cursor.execute("SELECT pg_current_wal_insert_lsn()")
+        (start_lsn,) = cursor.fetchone()
+
+        start = time.perf_counter()
+        cursor.execute(BULK_UPDATE, (rows,))
+        elapsed = time.perf_counter() - start
+        updated = cursor.rowcount
+
+        cursor.execute("SELECT pg_wal_lsn_diff(pg_current_wal_insert_lsn(), %s)", (start_lsn,))
+        (wal_bytes,) = cursor.fetchone()
+        cursor.execute(
+            "SELECT COUNT(*), COALESCE(SUM(pg_column_size(changed_fields)), 0) FROM employee_audit WHERE audit_id > %s",
+            (last_audit_id,)
+        )
+        audit_rows, audit_bytes = cursor.fetchone()
+        # What a naive full-row audit trigger would have stored for the same rows.
+        cursor.execute(
+            """
+            SELECT COALESCE(SUM(pg_column_size(to_jsonb(e))), 0)
+            FROM employees e
+            WHERE employee_id IN (SELECT employee_id FROM employees ORDER BY employee_id LIMIT %s)
+            """,
+            (rows,)
+        )
+        (naive_bytes,) = cursor.fetchone()
+        return {
+            "updated": updated, "seconds": elapsed, "wal_bytes": int(wal_bytes),
+            "audit_rows": audit_rows, "audit_bytes": int(audit_bytes), "naive_bytes": int(naive_bytes),
+        }
+    finally:
+        conn.rollback()
+        cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dbname", default="pms_bench")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per mode; the fastest is reported")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**dict(db.DB_CONFIG, dbname=args.dbname))
+    try:
+        results = {}
+        for audited in (False, True):
+            runs = [measure(conn, args.rows, audited) for _ in range(args.repeat)]
+            results[audited] = min(runs, key=lambda r: r["seconds"])
+    finally:
+        conn.close()
+
+    plain, audited = results[False], results[True]
+    print(f"Bulk update of {plain['updated']} employees")
+    print(f"{'':>10} {'seconds':>9} {'WAL MB':>9} {'audit rows':>11} {'audit MB':>9}")
+    for label, r in (("no audit", plain), ("audit", audited)):
+        print(f"{label:>10} {r['seconds']:>9.3f} {r['wal_bytes'] / 1e6:>9.2f} "
+              f"{r['audit_rows']:>11} {r['audit_bytes'] / 1e6:>9.2f}")
+    if plain["seconds"] and plain["wal_bytes"]:
+        print(f"Time overhead: {audited['seconds'] / plain['seconds'] - 1:+.0%}, "
+              f"WAL overhead: {audited['wal_bytes'] / plain['wal_bytes'] - 1:+.0%}")
+    if audited["naive_bytes"]:
+        print(f"Diff payload is {audited['audit_bytes'] / audited['naive_bytes']:.0%} "
+              f"of a full-row audit ({audited['naive_bytes'] / 1e6:.2f} MB)")
+
+
+if __name__ == "__main__":
+    main()
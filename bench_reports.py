@@ -0,0 +1,120 @@
+"""Benchmarks the parallel department report engine against a synthetic dataset.
+
+Run against a scratch database that has PMS.sql loaded, never against production:
+
+    createdb pms_bench && psql -d pms_bench -f PMS.sql
+    python bench_reports.py --dbname pms_bench --populate --departments 64 --employees 500000
+"""
+import argparse
+import os
+import time
+
+import psycopg2
+import backend_hr as db
+import reports_hr
+
+
+def populate(db_config, departments, employees):
+    """Adds synthetic departments with employees, tasks and ratings spread evenly across them."""
+    conn = psycopg2.connect(**db_config)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            INSERT INTO departments (department_name)
+            SELECT 'Bench Department ' || g FROM generate_series(1, %s) g
+            ON CONFLICT (department_name) DO NOTHING
+        """, (departments,))
+        cursor.execute("""
+            INSERT INTO employees (name, email, phone, department_id, job_title, salary, hire_date, gender)
+            SELECT 'Bench Employee ' || g,
+                   'bench.' || g || '.' || md5(random()::text) || '@example.com',
+                   '000-000-0000',
+                   d.department_id,
+                   'Synthetic Role',
+                   round((30000 + random() * 200000)::numeric, 2),
+                   DATE '2015-01-01' + (random() * 3650)::int,
+                   (ARRAY['Male', 'Female', 'Other'])[1 + (g %% 3)]
+            FROM generate_series(1, %s) g
+            JOIN (
+                SELECT department_id, row_number() OVER (ORDER BY department_id) - 1 AS slot
+                FROM departments WHERE department_name LIKE 'Bench Department %%'
+            ) d ON d.slot = g %% %s
+        """, (employees, departments))
+        cursor.execute("""
+            INSERT INTO tasks (employee_id, task_description, due_date, status)
+            SELECT e.employee_id, 'Synthetic task', CURRENT_DATE + (random() * 120 - 60)::int,
+                   (ARRAY['To Do', 'In Progress', 'Completed'])[1 + (e.employee_id %% 3)]
+            FROM employees e, generate_series(1, 3)
+            WHERE e.name LIKE 'Bench Employee %%'
+        """)
+        cursor.execute("""
+            INSERT INTO performance_ratings (employee_id, reporting_manager_id, rating, feedback, rating_date)
+            SELECT e.employee_id, e.employee_id, 1 + (random() * 4)::int, 'Synthetic rating', CURRENT_DATE
+            FROM employees e
+            WHERE e.name LIKE 'Bench Employee %%'
+        """)
+        conn.commit()
+        cursor.execute("ANALYZE")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dbname", default="pms_bench")
+    parser.add_argument("--populate", action="store_true", help="insert the synthetic dataset first")
+    parser.add_argument("--departments", type=int, default=64)
+    parser.add_argument("--employees", type=int, default=500000)
+    parser.add_argument("--workers", default=None,
+                        help="comma separated worker counts (default: 1, 2, 4, ... up to the CPU count)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per worker count; the best is reported")
+    args = parser.parse_args()
+
+    db_config = dict(db.DB_CONFIG, dbname=args.dbname)
+    if args.populate:
+        start = time.perf_counter()
+        populate(db_config, args.departments, args.employees)
+        print(f"Populated {args.employees} employees in {args.departments} departments "
+              f"in {time.perf_counter() - start:.1f}s")
+
+    if args.workers:
+        worker_counts = [int(w) for w in args.workers.split(",")]
+    else:
+        worker_counts, w = [], 1
+        while w <= (os.cpu_count() or 1):
+            worker_counts.append(w)
+            w *= 2
+
+    conn = psycopg2.connect(**db_config)
+    try:
+        department_ids = reports_hr.get_department_ids(conn)
+    finally:
+        conn.close()
+    # Pool startup (spawning workers, their imports and connections) is timed separately, so
+    # the scaling figures cover only the department work itself.
+    print(f"{'workers':>8} {'startup':>9} {'seconds':>9} {'speedup':>8} {'efficiency':>11}")
+    baseline = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        pool = reports_hr.start_worker_pool(workers, db_config, warm=True)
+        startup = time.perf_counter() - start
+        timings = []
+        try:
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                reports_hr.compute_partials(pool, department_ids)
+                timings.append(time.perf_counter() - start)
+        finally:
+            pool.shutdown()
+        best = min(timings)
+        # Speedup and efficiency are relative to the first (smallest) worker count.
+        if baseline is None:
+            baseline = best
+        speedup = baseline / best
+        efficiency = speedup / (workers / worker_counts[0])
+        print(f"{workers:>8} {startup:>9.2f} {best:>9.2f} {speedup:>8.2f} {efficiency:>11.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Tracks cold import time and per-rerun overhead of the Streamlit app.
+
+    python bench_startup.py                      # login page only; runs without a database
+    python bench_startup.py --page "Employee Dashboard" --reruns 50
+
+Import times are measured in fresh interpreters so module caches don't hide them.
+Reruns use Streamlit's AppTest, which executes the script the way the server does
+on every interaction. The login page still tries the app's daily audit partition
+upkeep; with no database that attempt fails fast and is repeated on every rerun.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+APP_FILE = "frontend_hr.py"
+HEAVY_MODULES = ["pandas", "altair", "psycopg2", "jobs_hr", "reports_hr"]
+
+IMPORT_PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed, ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def measure_import(module, repeat):
+    """Returns the best cold import time of a module and the heavy modules it pulled in."""
+    timings, loaded = [], ""
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip().splitlines()[-1]
+        elapsed, _, loaded = output.partition(" ")
+        timings.append(float(elapsed))
+    return min(timings), loaded
+
+
+def measure_reruns(page, reruns):
+    """Runs the app once cold, then `reruns` times, and returns the per-run timings."""
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(APP_FILE, default_timeout=60)
+    if page:
+        import backend_hr as db
+
+        # Same record authenticate_user() returns for the seeded HR login, with a real session
+        # behind it, as the login form leaves them in session_state.
+        user = {"user_id": 1, "username": "Shreya", "display_name": "Shreya", "employee_id": 4}
+        session_token = db.create_session(user["user_id"])
+        if not session_token:
+            raise RuntimeError("Could not create a session; --page needs the database.")
+        app.session_state["user"] = user
+        app.session_state["session_token"] = session_token
+        app.session_state["resume_issued_at"] = time.monotonic()
+
+    start = time.perf_counter()
+    app.run()
+    first_run = time.perf_counter() - start
+    if page:
+        app.sidebar.radio[0].set_value(page)
+
+    timings = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        app.run()
+        timings.append(time.perf_counter() - start)
+    if app.exception:
+        raise RuntimeError(f"App raised: {app.exception[0].message}")
+    return first_run, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page", default=None, help="sidebar page to measure (needs the database); default: login page")
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per import measurement")
+    args = parser.parse_args()
+
+    print("Cold import time (best of %d)" % args.repeat)
+    for module in ["streamlit", "backend_hr", "frontend_hr", "pandas", "altair", "jobs_hr"]:
+        elapsed, loaded = measure_import(module, args.repeat)
+        print(f"  {module:<12} {elapsed * 1000:8.1f} ms   heavy modules loaded: {loaded or '-'}")
+
+    first_run, timings = measure_reruns(args.page, args.reruns)
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"\nScript runs on {args.page or 'login page'}")
+    print(f"  first run   {first_run * 1000:8.1f} ms")
+    print(f"  rerun p50   {statistics.median(timings) * 1000:8.1f} ms")
+    print(f"  rerun p95   {p95 * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
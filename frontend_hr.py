@@ -1,9 +1,15 @@
+import json
+import os
+import time
+import psycopg2
 import streamlit as st
-import pandas as pd
 import backend_hr as db
-import altair as alt
 from datetime import date
-from collections import defaultdict
+
+# pandas, altair and the background job modules are imported inside the pages that
+# use them, so the login page and cold start don't pay for them.
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -13,52 +19,41 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+# --- Static Assets (read once per process) ---
+@st.cache_resource
+def load_css():
+    """Reads the app stylesheet."""
+    with open(os.path.join(APP_DIR, "style.css"), encoding="utf-8") as f:
+        return f"<style>\n{f.read()}</style>"
+
+@st.cache_resource
+def load_header_image():
+    """Reads the dashboard header image."""
+    with open(os.path.join(APP_DIR, "header.webp"), "rb") as f:
+        return f.read()
+
+@st.cache_resource
+def load_jd_catalog():
+    """Reads the job description / specification catalog."""
+    with open(os.path.join(APP_DIR, "jd_catalog.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+# --- Database Maintenance (once per process per day) ---
+@st.cache_resource(ttl=24 * 3600)
+def maintain_audit_partitions():
+    """Creates the next months' employee_audit partitions before audit rows spill into the default one."""
+    return db.ensure_audit_partitions()
+
 # --- CSS Styling for a beautiful app ---
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 3em;
-        font-weight: bold;
-        color:#4682B4;
-        text-align: center;
-        margin-bottom: 20px;
-    }
-    .stButton>button {
-        background-color:#4682B4;
-        color: white;
-        border-radius: 5px;
-        border: none;
-        padding: 10px 20px;
-    }
-    .stSelectbox > div > div > div > span {
-        font-size: 1.1em;
-    }
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 24px;
-    }
-    .stTabs [data-baseweb="tab"] {
-        height: 50px;
-        white-space: nowrap;
-        background-color: #f0f2f6;
-        border-radius: 4px 4px 0 0;
-        gap: 10px;
-        padding-top: 10px;
-        padding-bottom: 10px;
-    }
-    .stTabs [aria-selected="true"] {
-        background-color: #4682B4;
-        color: white;
-    }
-    .centered-container {
-        display: flex;
-        justify-content: center;
-        align-items: center;
-        height: 100vh;
-    }
-</style>
-""", unsafe_allow_html=True)
+st.markdown(load_css(), unsafe_allow_html=True)
 
 # --- Helper Functions ---
+def clear_search_cache():
+    """Drops this session's cached search results after an employee was changed."""
+    if 'employee_search' in st.session_state:
+        st.session_state.employee_search.clear()
+    st.session_state.pop('last_search', None)
+
 def display_company_info():
     """Displays company vision, mission, etc."""
     st.header("🏢 Company Details 25406")
@@ -68,11 +63,14 @@ def display_company_info():
         **Core Competency:** We excel in collaborative problem-solving and leveraging cutting-edge technology.
         **Goal:** To grow our market share by 20% in the next fiscal year through strategic talent development.
     """)
-    st.image("C:/Users/SHREYA/Desktop/DBDWBI End/pms HR/header.webp", use_container_width=True)
+    st.image(load_header_image(), use_container_width=True)
 
 
 def display_business_insights():
     """Displays various business insights using charts."""
+    import pandas as pd
+    import altair as alt
+
     st.header("📊 Business Insights")
     insights = db.get_business_insights()
 
@@ -85,57 +83,117 @@ def display_business_insights():
         with col3:
             st.metric("Avg Salary", f"₹{insights['avg_salary']:.2f}" if insights['avg_salary'] else "N/A")
 
-        st.subheader("Gender & Diversity Ratio")
-        gender_df = pd.DataFrame(list(insights['gender_ratio'].items()), columns=['Gender', 'Ratio'])
-        if not gender_df.empty:
-            gender_chart = alt.Chart(gender_df).mark_arc(outerRadius=120).encode(
-                theta=alt.Theta("Ratio", stack=True),
-                color=alt.Color("Gender", scale=alt.Scale(range=['#cc79a7', '#4293c5', '#63b179'])),
-                order=alt.Order("Ratio", sort="descending"),
-                tooltip=["Gender", alt.Tooltip("Ratio", format=".1%")]
-            ).properties(
-                title="Gender Ratio"
-            )
-            st.altair_chart(gender_chart, use_container_width=True)
-        else:
-            st.info("No gender data available.")
-
-
-        st.subheader("Employees per Department")
-        if insights['employees_by_dept']:
-            dept_count_df = pd.DataFrame(list(insights['employees_by_dept'].items()), columns=['Department', 'Count'])
-            dept_count_chart = alt.Chart(dept_count_df).mark_bar(color="#7b2bf2").encode(
-                x=alt.X('Department', sort='-y'),
-                y='Count',
-                tooltip=['Department', 'Count']
-            ).properties(title="Number of Employees per Department")
-            st.altair_chart(dept_count_chart, use_container_width=True)
-        else:
-            st.info("No employee count data by department available.")
-
-        st.subheader("Task Status Distribution")
-        if insights['task_status_data']:
-            task_status_df = pd.DataFrame(list(insights['task_status_data'].items()), columns=['Status', 'Count'])
-            task_status_chart = alt.Chart(task_status_df).mark_arc(outerRadius=120).encode(
-                theta=alt.Theta("Count", stack=True),
-                color=alt.Color("Status", scale=alt.Scale(range=['#FFD700', '#1E90FF', '#32CD32'])),
-                order=alt.Order("Count", sort="descending"),
-                tooltip=["Status", "Count"]
-            ).properties(title="Task Status")
-            st.altair_chart(task_status_chart, use_container_width=True)
+        # Only the selected chart is queried into a DataFrame and rendered on each rerun.
+        section = st.radio("Chart", ["Gender & Diversity Ratio", "Employees per Department", "Task Status Distribution",
+                                     "Salary Distribution", "Hiring Over Time"],
+                           horizontal=True, label_visibility="collapsed")
+
+        if section == "Gender & Diversity Ratio":
+            st.subheader("Gender & Diversity Ratio")
+            gender_df = pd.DataFrame(list(insights['gender_ratio'].items()), columns=['Gender', 'Ratio'])
+            if not gender_df.empty:
+                gender_chart = alt.Chart(gender_df).mark_arc(outerRadius=120).encode(
+                    theta=alt.Theta("Ratio", stack=True),
+                    color=alt.Color("Gender", scale=alt.Scale(range=['#cc79a7', '#4293c5', '#63b179'])),
+                    order=alt.Order("Ratio", sort="descending"),
+                    tooltip=["Gender", alt.Tooltip("Ratio", format=".1%")]
+                ).properties(
+                    title="Gender Ratio"
+                )
+                st.altair_chart(gender_chart, use_container_width=True)
+            else:
+                st.info("No gender data available.")
+
+        elif section == "Employees per Department":
+            st.subheader("Employees per Department")
+            if insights['employees_by_dept']:
+                dept_count_df = pd.DataFrame(list(insights['employees_by_dept'].items()), columns=['Department', 'Count'])
+                dept_count_chart = alt.Chart(dept_count_df).mark_bar(color="#7b2bf2").encode(
+                    x=alt.X('Department', sort='-y'),
+                    y='Count',
+                    tooltip=['Department', 'Count']
+                ).properties(title="Number of Employees per Department")
+                st.altair_chart(dept_count_chart, use_container_width=True)
+            else:
+                st.info("No employee count data by department available.")
+
+        elif section == "Task Status Distribution":
+            st.subheader("Task Status Distribution")
+            if insights['task_status_data']:
+                task_status_df = pd.DataFrame(list(insights['task_status_data'].items()), columns=['Status', 'Count'])
+                task_status_chart = alt.Chart(task_status_df).mark_arc(outerRadius=120).encode(
+                    theta=alt.Theta("Count", stack=True),
+                    color=alt.Color("Status", scale=alt.Scale(range=['#FFD700', '#1E90FF', '#32CD32'])),
+                    order=alt.Order("Count", sort="descending"),
+                    tooltip=["Status", "Count"]
+                ).properties(title="Task Status")
+                st.altair_chart(task_status_chart, use_container_width=True)
+            else:
+                st.info("No task status data available.")
+
+        elif section == "Salary Distribution":
+            st.subheader("Salary Distribution")
+            salary_bins = db.get_salary_histogram()
+            if salary_bins:
+                salary_df = pd.DataFrame(salary_bins)
+                salary_chart = alt.Chart(salary_df).mark_bar(color="#4682B4").encode(
+                    x=alt.X('bin_start:Q', title='Salary'),
+                    x2='bin_end:Q',
+                    y=alt.Y('count:Q', title='Employees'),
+                    tooltip=[alt.Tooltip('bin_start:Q', format=',.0f', title='From'),
+                             alt.Tooltip('bin_end:Q', format=',.0f', title='To'), 'count:Q']
+                ).properties(title="Employees per Salary Band")
+                st.altair_chart(salary_chart, use_container_width=True)
+            else:
+                st.info("No salary data available.")
+
         else:
-            st.info("No task status data available.")
+            st.subheader("Hiring Over Time")
+            hiring = db.get_hiring_trend()
+            if hiring:
+                hiring_df = pd.DataFrame(hiring)
+                hiring_df['period'] = pd.to_datetime(hiring_df['period'])
+                base = alt.Chart(hiring_df).encode(x=alt.X('period:T', title=hiring[0]['grain'].title()))
+                hires_bars = base.mark_bar(color="#63b179").encode(
+                    y=alt.Y('hires:Q', title='Hires'),
+                    tooltip=[alt.Tooltip('period:T'), 'hires:Q', 'cumulative_hires:Q']
+                )
+                cumulative_line = base.mark_line(color="#7b2bf2").encode(y=alt.Y('cumulative_hires:Q', title='Total Hired'))
+                hiring_chart = alt.layer(hires_bars, cumulative_line).resolve_scale(y='independent').properties(
+                    title="Hires per Period"
+                )
+                st.altair_chart(hiring_chart, use_container_width=True)
+            else:
+                st.info("No hiring data available.")
+
+ARCHIVE_PAGE_SIZE = 25
 
 def display_employee_management():
     """Manages the employee CRUD operations."""
+    import pandas as pd
+
     st.header("🧑‍💼 Employee Management")
 
     tab1, tab2, tab3, tab4, tab5 = st.tabs(["List/Search", "Create", "Update", "Delete", "Deleted Employees"])
 
     with tab1: # List/Search
+        import search_hr
+
+        searcher = st.session_state.setdefault('employee_search', search_hr.EmployeeSearch())
+        # Submits on Enter or blur, not per keystroke.
         search_query = st.text_input("🔍 Search employees by name or email")
         if search_query:
-            employees = db.search_employees(search_query)
+            # Every tab runs on every rerun, so only a changed query reaches the searcher
+            # (and its statistics); otherwise the last answer is shown again.
+            last_query, employees, source = st.session_state.get('last_search', (None, None, None))
+            if search_query != last_query:
+                employees, source = searcher.search(search_query)
+                if source != search_hr.SOURCE_THROTTLED:
+                    st.session_state.last_search = (search_query, employees, source)
+            if source == search_hr.SOURCE_TOO_SHORT:
+                st.info(f"Type at least {search_hr.MIN_QUERY_LENGTH} characters to search.")
+            elif source == search_hr.SOURCE_THROTTLED:
+                st.warning("You are searching faster than allowed. Please wait a moment and try again.")
         else:
             employees = db.get_all_employees()
 
@@ -146,9 +204,14 @@ def display_employee_management():
             # Reordering columns to show employee_id
             cols_to_display = ['employee_id', 'name', 'email', 'department_name', 'job_title', 'salary', 'Profile Photo']
             st.markdown(employees_df[cols_to_display].to_html(escape=False), unsafe_allow_html=True)
-        else:
+        elif employees is not None:
             st.info("No employees found.")
 
+        search_stats = searcher.stats()
+        if search_stats['hit_rate'] is not None:
+            st.caption(f"Search cache hit rate: {search_stats['hit_rate']:.0%} · "
+                       f"p95 latency: {search_stats['p95_ms']:.1f} ms · throttled: {search_stats['throttled']}")
+
     with tab2: # Create
         st.subheader("Add a New Employee")
         with st.form("create_employee_form"):
@@ -176,6 +239,7 @@ def display_employee_management():
                     }
                     if db.create_employee(employee_data):
                         st.success("Employee added successfully!")
+                        clear_search_cache()
                         st.rerun()
                     else:
                         st.error("Failed to add employee. Email may already exist.")
@@ -190,6 +254,14 @@ def display_employee_management():
             selected_id = employee_map[selected_employee_name]
             emp_details = [emp for emp in employees if emp['employee_id'] == selected_id][0]
 
+            # Keep the record as it was when the form was opened: it is the baseline for
+            # detecting changed fields and edits saved by someone else in the meantime.
+            loaded = st.session_state.get('update_employee_loaded')
+            if not loaded or loaded['employee_id'] != selected_id:
+                st.session_state.update_employee_loaded = emp_details
+            else:
+                emp_details = loaded
+
             with st.form("update_employee_form"):
                 new_name = st.text_input("Name", value=emp_details['name'])
                 new_email = st.text_input("Email", value=emp_details['email'])
@@ -202,6 +274,16 @@ def display_employee_management():
                 new_hire_date = st.date_input("Hire Date", value=pd.to_datetime(emp_details['hire_date']))
                 new_gender = st.selectbox("Gender", ["Male", "Female", "Other"], index=["Male", "Female", "Other"].index(emp_details['gender']))
                 new_profile_photo = st.text_input("Profile Photo URL", value=emp_details['profile_photo'])
+                manager_options = {"No manager": None}
+                manager_options.update({
+                    f"ID:{emp['employee_id']} - {emp['name']}": emp['employee_id']
+                    for emp in employees if emp['employee_id'] != selected_id
+                })
+                manager_labels = list(manager_options.keys())
+                current_manager = next((label for label, manager_id in manager_options.items()
+                                        if manager_id == emp_details['manager_id']), "No manager")
+                manager_label = st.selectbox("Reports To", manager_labels, index=manager_labels.index(current_manager))
+                new_manager_id = manager_options[manager_label]
 
                 submitted = st.form_submit_button("Update Employee")
                 if submitted:
@@ -209,11 +291,21 @@ def display_employee_management():
                         'name': new_name, 'email': new_email, 'phone': new_phone,
                         'department_id': new_department_id, 'job_title': new_job_title,
                         'salary': new_salary, 'hire_date': new_hire_date,
-                        'gender': new_gender, 'profile_photo': new_profile_photo
+                        'gender': new_gender, 'profile_photo': new_profile_photo,
+                        'manager_id': new_manager_id
                     }
-                    if db.update_employee(selected_id, updated_data):
+                    result = db.update_employee_fields(selected_id, emp_details, updated_data)
+                    if result == db.UPDATE_APPLIED:
+                        st.session_state.pop('update_employee_loaded', None)
                         st.success("Employee details updated successfully!")
+                        clear_search_cache()
                         st.rerun()
+                    elif result == db.UPDATE_UNCHANGED:
+                        st.info("No changes to save.")
+                    elif result == db.UPDATE_CONFLICT:
+                        st.session_state.pop('update_employee_loaded', None)
+                        st.error("This employee was changed by someone else after you opened the form. "
+                                 "Reload to see the latest details before editing again.")
                     else:
                         st.error("Failed to update employee.")
 
@@ -222,33 +314,97 @@ def display_employee_management():
         employees = db.get_all_employees()
         employee_map = {f"ID:{emp['employee_id']} - {emp['name']}": emp['employee_id'] for emp in employees}
         employee_to_delete = st.selectbox("Select Employee to Delete", list(employee_map.keys()))
+        delete_reason = st.text_input("Reason (optional)")
+        st.caption("Their tasks and ratings are archived with them, and their reports move up to their manager.")
         if st.button("Permanently Delete Employee"):
             if employee_to_delete:
                 selected_id = employee_map[employee_to_delete]
-                if db.delete_employee(selected_id):
+                if db.delete_employee(selected_id, delete_reason or None):
                     st.success("Employee deleted successfully and archived.")
+                    clear_search_cache()
+                    st.session_state.pop('archive_page_cursors', None)
                     st.rerun()
                 else:
                     st.error("Failed to delete employee.")
 
     with tab5: # Deleted Employees
         st.subheader("Archived (Deleted) Employees")
-        deleted_employees = db.get_deleted_employees()
-        if deleted_employees:
-            deleted_df = pd.DataFrame(deleted_employees)
-            st.dataframe(deleted_df)
+        # One cursor per visited page; the last one is where the current page starts.
+        page_cursors = st.session_state.setdefault('archive_page_cursors', [None])
+        archived, next_cursor = db.get_archived_employees(after=page_cursors[-1], page_size=ARCHIVE_PAGE_SIZE)
+        if archived:
+            st.dataframe(pd.DataFrame(archived), hide_index=True)
+
+            col1, col2, col3 = st.columns([1, 1, 2])
+            with col1:
+                if st.button("Previous", disabled=len(page_cursors) == 1):
+                    page_cursors.pop()
+                    st.rerun()
+            with col2:
+                if st.button("Next", disabled=next_cursor is None):
+                    page_cursors.append(next_cursor)
+                    st.rerun()
+            with col3:
+                st.caption(f"Page {len(page_cursors)}")
+
+            archived_map = {f"ID:{emp['employee_id']} - {emp['name']}": emp['employee_id'] for emp in archived}
+            to_restore = st.multiselect("Select employees to restore", list(archived_map.keys()))
+            if st.button("Restore Selected", disabled=not to_restore):
+                restored = db.restore_employees([archived_map[label] for label in to_restore])
+                if restored is None:
+                    st.error("Failed to restore employees.")
+                else:
+                    st.success(f"Restored {restored} employee(s) with their tasks and ratings.")
+                    clear_search_cache()
+                    st.session_state.archive_page_cursors = [None]
+                    st.rerun()
+        elif len(page_cursors) > 1:
+            # The page emptied under us (e.g. its rows were restored elsewhere); start over.
+            st.session_state.archive_page_cursors = [None]
+            st.rerun()
         else:
             st.info("No employees have been deleted yet.")
 
 def display_task_management():
     """Manages tasks for HR department employees."""
+    import pandas as pd
+
     st.header("📝 Task Management")
 
     tab1, tab2 = st.tabs(["View All Tasks", "Assign Task (HR Dept)"])
 
     with tab1: # View All Tasks
-        st.subheader("All Employee Tasks (Sorted by Due Date)")
-        tasks = db.get_tasks_by_due_date()
+        st.subheader("Open Tasks by Due Date")
+        summary = db.get_task_schedule_summary()
+        bucket_counts = {bucket: 0 for bucket in db.TASK_BUCKETS}
+        for row in summary:
+            bucket_counts[row['bucket']] += row['task_count']
+
+        bucket_cols = st.columns(len(db.TASK_BUCKETS))
+        for col, bucket in zip(bucket_cols, db.TASK_BUCKETS):
+            with col:
+                st.metric(bucket, bucket_counts[bucket])
+
+        if summary:
+            summary_df = pd.DataFrame(summary)
+            summary_pivot = summary_df.pivot_table(
+                index=['employee_name', 'status'], columns='bucket', values='task_count',
+                aggfunc='sum', fill_value=0
+            ).reindex(columns=db.TASK_BUCKETS, fill_value=0)
+            with st.expander("Open tasks per employee and status"):
+                st.dataframe(summary_pivot)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            selected_bucket = st.selectbox("Due", ["All Open"] + db.TASK_BUCKETS)
+        bucket = None if selected_bucket == "All Open" else selected_bucket
+        total_tasks = bucket_counts[bucket] if bucket else sum(bucket_counts.values())
+        page_size = 25
+        page_count = max(1, -(-total_tasks // page_size))
+        with col2:
+            page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1)
+
+        tasks = db.get_task_schedule_page(bucket, page - 1, page_size)
         if tasks:
             tasks_df = pd.DataFrame(tasks)
             st.dataframe(tasks_df)
@@ -266,7 +422,7 @@ def display_task_management():
                     else:
                         st.error("Failed to update task status.")
         else:
-            st.info("No tasks found.")
+            st.info("No open tasks found.")
 
     with tab2: # Assign Task (HR Dept)
         st.subheader("Assign a New Task to HR Department Employee")
@@ -295,9 +451,11 @@ def display_task_management():
 
 def display_performance_management():
     """Manages employee ratings and feedback."""
+    import pandas as pd
+
     st.header("⭐ Performance Management")
 
-    tab1, tab2, tab3 = st.tabs(["View All Ratings", "Rate HR Employee", "Feedback/Recognition"])
+    tab1, tab2, tab3, tab4 = st.tabs(["View All Ratings", "Rate HR Employee", "Feedback/Recognition", "Teams"])
 
     with tab1: # View All Ratings
         st.subheader("All Employee Ratings")
@@ -316,14 +474,27 @@ def display_performance_management():
             selected_employee_name = st.selectbox("Select HR Employee to Rate", hr_employee_names)
             selected_employee_id = list(hr_employees.keys())[list(hr_employees.values()).index(selected_employee_name)]
 
+            # Ratings are given by the employee's direct manager; employees without one are rated by HR.
+            management_chain = db.get_management_chain(selected_employee_id)
+            if management_chain:
+                rater_id, rater_name = management_chain[0]['employee_id'], management_chain[0]['name']
+            else:
+                user = st.session_state.user
+                rater_id, rater_name = user['employee_id'], user['display_name']
+            if rater_id is None:
+                # performance_ratings needs a rater; logins without an employee record can't stand in for HR.
+                st.warning(f"{selected_employee_name} has no manager to rate them, and your login is not linked "
+                           "to an employee record (app_users.employee_id), so you can't rate them on HR's behalf.")
+            else:
+                st.caption(f"Rated by: {rater_name}")
+
             with st.form("give_rating_form"):
                 rating = st.slider("Rating (1-5)", 1, 5, 3)
                 feedback = st.text_area("Feedback")
-                shreya_nayak_id = 4
-                
-                submitted = st.form_submit_button("Submit Rating")
+
+                submitted = st.form_submit_button("Submit Rating", disabled=rater_id is None)
                 if submitted:
-                    if db.give_rating_to_employee(selected_employee_id, shreya_nayak_id, rating, feedback):
+                    if db.give_rating_to_employee(selected_employee_id, rater_id, rating, feedback):
                         st.success("Rating submitted successfully!")
                         st.rerun()
                     else:
@@ -345,7 +516,7 @@ def display_performance_management():
             st.markdown("---")
             st.subheader(f"Performance Metrics for {selected_employee_name}")
 
-            tasks = [t for t in db.get_tasks_by_due_date() if t['employee_name'] == selected_employee_name]
+            tasks = db.get_employee_tasks(selected_id)
             st.markdown("#### Task Completion Status")
             if tasks:
                 tasks_df = pd.DataFrame(tasks)
@@ -371,20 +542,69 @@ def display_performance_management():
                 else:
                     st.warning("Please write a recognition message.")
 
+    with tab4: # Teams
+        st.subheader("Team Ratings by Manager")
+        rollup = db.get_team_rating_rollup()
+        if rollup:
+            rollup_df = pd.DataFrame(rollup)
+            st.dataframe(rollup_df[['manager_name', 'team_size', 'ratings', 'avg_rating']], hide_index=True)
+
+            manager_map = {f"ID:{row['manager_id']} - {row['manager_name']}": row['manager_id'] for row in rollup}
+            selected_manager = st.selectbox("Select Manager", list(manager_map.keys()))
+            direct_only = st.checkbox("Direct reports only")
+            reports = db.get_reports(manager_map[selected_manager], direct_only=direct_only)
+            if reports:
+                st.dataframe(pd.DataFrame(reports), hide_index=True)
+            else:
+                st.info("No reports found for this manager.")
+        else:
+            st.info("No reporting lines have been set up yet.")
+
+        st.markdown("---")
+        st.subheader("Reporting Chain")
+        employees = db.get_all_employees()
+        employee_map = {f"ID:{emp['employee_id']} - {emp['name']}": emp['employee_id'] for emp in employees}
+        selected_employee = st.selectbox("Select Employee", list(employee_map.keys()), key="chain_employee")
+        if selected_employee:
+            chain = db.get_management_chain(employee_map[selected_employee])
+            if chain:
+                st.markdown(" → ".join(f"**{manager['name']}** ({manager['job_title']})" for manager in chain))
+            else:
+                st.info("This employee does not report to anyone.")
+
 # --- Workforce Planning ---
+ROLES_BY_DEPT = {
+    "Engineering": ["Software Engineer", "Senior Developer", "QA Analyst", "Data Scientist"],
+    "Marketing": ["Marketing Specialist", "Digital Marketing Manager", "Content Creator", "SEO Analyst"],
+    "Finance": ["Financial Analyst", "Accountant", "Finance Manager", "Auditor"],
+    "HR": ["HR Manager", "HR Analyst", "Recruitment Specialist", "Benefits Coordinator"],
+    "Operations": ["Operations Manager", "Supply Chain Analyst", "Project Manager"],
+    "Sales": ["Sales Manager", "Account Executive", "Business Development Representative"]
+}
+
+RECRUITMENT_STATE_KEY = "recruitment_funnel"
+DEFAULT_RECRUITMENT_FUNNEL = {
+    'Department': ['Engineering', 'Marketing', 'Finance', 'HR', 'Operations', 'Sales'],
+    'Applicants': [250, 400, 300, 350, 200, 450],
+    'Interviews': [150, 300, 210, 230, 110, 360],
+    'Offers': [140, 250, 180, 220, 100, 320],
+    'Hires': [100, 210, 150, 190, 80, 280]
+}
+
 def display_workforce_planning():
     """Displays workforce planning and recruitment details."""
+    import pandas as pd
+
     st.header("👥 Workforce Planning & Recruitment")
 
-    # Session state for managing edit mode and data
+    # The recruitment funnel is saved per user, so edits survive logout and follow the
+    # user to any app worker; session_state only caches it for the current browser session.
+    user_id = st.session_state.user['user_id']
     if 'recruitment_data' not in st.session_state:
-        st.session_state.recruitment_data = pd.DataFrame({
-            'Department': ['Engineering', 'Marketing', 'Finance', 'HR', 'Operations', 'Sales'],
-            'Applicants': [250, 400, 300, 350, 200, 450],
-            'Interviews': [150, 300, 210, 230, 110, 360],
-            'Offers': [140, 250, 180, 220, 100, 320],
-            'Hires': [100, 210, 150, 190, 80, 280]
-        })
+        saved_funnel = db.get_user_state(user_id, RECRUITMENT_STATE_KEY)
+        # Saved in "split" form, since JSONB does not keep the key order that sets the column order.
+        st.session_state.recruitment_data = (pd.DataFrame(**saved_funnel) if saved_funnel
+                                             else pd.DataFrame(DEFAULT_RECRUITMENT_FUNNEL))
         
     st.subheader("Workforce Planning")
     st.info("Forecast hiring needs for specific roles and departments.")
@@ -397,17 +617,9 @@ def display_workforce_planning():
     with col1:
         selected_dept_name = st.selectbox("Select Department", dept_names)
     
-    roles_by_dept = {
-        "Engineering": ["Software Engineer", "Senior Developer", "QA Analyst", "Data Scientist"],
-        "Marketing": ["Marketing Specialist", "Digital Marketing Manager", "Content Creator", "SEO Analyst"],
-        "Finance": ["Financial Analyst", "Accountant", "Finance Manager", "Auditor"],
-        "HR": ["HR Manager", "HR Analyst", "Recruitment Specialist", "Benefits Coordinator"],
-        "Operations": ["Operations Manager", "Supply Chain Analyst", "Project Manager"],
-        "Sales": ["Sales Manager", "Account Executive", "Business Development Representative"]
-    }
 
     with col2:
-        roles_for_dept = roles_by_dept.get(selected_dept_name, ["Select a role"])
+        roles_for_dept = ROLES_BY_DEPT.get(selected_dept_name, ["Select a role"])
         selected_role = st.selectbox("Select Role", roles_for_dept)
 
     with col3:
@@ -451,102 +663,17 @@ def display_workforce_planning():
     st.info("Edit the raw recruitment funnel data below. Values represent counts, not percentages.")
     
     # Using st.data_editor to allow direct editing
-    st.session_state.recruitment_data = st.data_editor(st.session_state.recruitment_data, hide_index=True)
+    edited_data = st.data_editor(st.session_state.recruitment_data, hide_index=True)
+    if not edited_data.equals(st.session_state.recruitment_data):
+        if db.set_user_state(user_id, RECRUITMENT_STATE_KEY, json.loads(edited_data.to_json(orient="split", index=False))):
+            st.session_state.recruitment_data = edited_data
+        else:
+            st.error("Failed to save recruitment data.")
             
     st.markdown("---")
     st.subheader("Job Descriptions (JD) & Specifications (JS)")
     
-    jd_js_data = {
-        "Software Engineer": {
-            "JD": "Develop, test, and maintain software applications using Python, JavaScript, and other relevant technologies. Collaborate with cross-functional teams to define, design, and ship new features.",
-            "JS": "Bachelor's degree in Computer Science or a related field. 3+ years of experience in software development. Strong proficiency in Python, JavaScript, and database management."
-        },
-        "Senior Developer": {
-            "JD": "Lead the design and implementation of complex software solutions. Mentor junior developers, conduct code reviews, and ensure high-quality code standards are met. Drive technical innovation and architectural decisions.",
-            "JS": "Master's degree in a technical field preferred. 7+ years of hands-on experience in full-stack development. Proven leadership skills and a track record of successful project delivery."
-        },
-        "QA Analyst": {
-            "JD": "Design and execute test plans to ensure the quality of software products. Identify, document, and track bugs. Work with development teams to resolve issues and improve product quality.",
-            "JS": "Bachelor's degree in a technical field or equivalent experience. 2+ years of experience in software quality assurance. Familiarity with automated testing tools and a strong attention to detail."
-        },
-        "Data Scientist": {
-            "JD": "Develop and implement statistical models, machine learning algorithms, and data analysis pipelines to uncover actionable insights. Communicate findings to stakeholders and support data-driven decision-making.",
-            "JS": "Master's or PhD in a quantitative field (e.g., Data Science, Statistics, Computer Science). Expertise in Python/R and libraries like scikit-learn, TensorFlow. Experience with data visualization tools like Tableau or Power BI."
-        },
-        "Marketing Specialist": {
-            "JD": "Execute marketing campaigns across various channels, manage social media presence, and analyze campaign performance metrics to optimize ROI. Assist in content creation and market research.",
-            "JS": "Bachelor's degree in Marketing, Communications, or a related field. 2+ years of experience in digital marketing. Proficiency with digital marketing platforms (e.g., Google Ads, Meta Ads) and analytics tools."
-        },
-        "Digital Marketing Manager": {
-            "JD": "Develop and oversee the company's digital marketing strategy. Manage a team of marketing specialists, analyze market trends, and implement data-driven campaigns to achieve business goals.",
-            "JS": "Bachelor's degree in Marketing. 5+ years of experience in digital marketing, with 2+ years in a leadership role. Strong project management and analytical skills."
-        },
-        "Content Creator": {
-            "JD": "Produce engaging and informative content for blogs, social media, and websites. Research industry-related topics and create content that drives audience engagement and brand growth.",
-            "JS": "Bachelor's degree in English, Journalism, or a related field. Proven experience as a content creator with a strong portfolio. Excellent writing, editing, and communication skills."
-        },
-        "SEO Analyst": {
-            "JD": "Optimize website content and structure for search engines to improve organic rankings and traffic. Conduct keyword research, technical audits, and competitor analysis.",
-            "JS": "2+ years of experience in SEO. Proficiency with SEO tools like SEMrush, Ahrefs, and Google Analytics. Strong analytical and problem-solving skills."
-        },
-        "Financial Analyst": {
-            "JD": "Analyze financial data, prepare reports, and forecast business performance. Support budgeting, financial modeling, and investment analysis to guide strategic decisions.",
-            "JS": "Bachelor's degree in Finance, Accounting, or Economics. 3+ years of experience in financial analysis. Strong knowledge of financial software and advanced Excel skills."
-        },
-        "Accountant": {
-            "JD": "Manage all financial transactions, including ledger entries, bank reconciliations, and payroll. Prepare financial statements and ensure compliance with accounting standards.",
-            "JS": "Bachelor's degree in Accounting. Certified Public Accountant (CPA) license is a plus. 2+ years of experience in a similar role. Proficiency with accounting software like QuickBooks."
-        },
-        "Finance Manager": {
-            "JD": "Oversee the finance department, manage financial reporting, and develop strategies to improve financial health. Lead budgeting and forecasting processes.",
-            "JS": "Master's degree in Finance or MBA. 7+ years of experience in finance, with 3+ years in a management position. Strong leadership and strategic planning skills."
-        },
-        "Auditor": {
-            "JD": "Examine financial records and statements to ensure accuracy and compliance with laws and regulations. Identify financial risks and make recommendations for improvement.",
-            "JS": "Bachelor's degree in Accounting or Finance. Certified Internal Auditor (CIA) or Certified Public Accountant (CPA) license required. 3+ years of experience in auditing."
-        },
-        "HR Manager": {
-            "JD": "Lead the HR department, develop and implement HR policies, and manage employee relations. Oversee recruitment, training, and performance management processes.",
-            "JS": "Bachelor's degree in Human Resources or Business Administration. 5+ years of experience in HR, with 2+ years in a management role. Strong knowledge of labor laws and regulations."
-        },
-        "HR Analyst": {
-            "JD": "Analyze HR data, create reports, and support the HR team with strategic initiatives related to compensation, benefits, and employee engagement.",
-            "JS": "Bachelor's degree in Human Resources or Business, with a strong background in data analysis and Excel. Experience with HRIS systems is a plus."
-        },
-        "Recruitment Specialist": {
-            "JD": "Manage the end-to-end recruitment process, from sourcing to onboarding. Build and maintain talent pipelines, conduct interviews, and ensure a positive candidate experience.",
-            "JS": "Bachelor's degree in HR, Business, or a related field. 3+ years of experience in recruitment, with strong communication and negotiation skills."
-        },
-        "Benefits Coordinator": {
-            "JD": "Administer employee benefits programs, including health insurance, retirement plans, and leave policies. Communicate benefits information to employees and resolve related inquiries.",
-            "JS": "Associate's or Bachelor's degree in HR. 1+ years of experience in benefits administration. Strong organizational skills and attention to detail."
-        },
-        "Operations Manager": {
-            "JD": "Oversee daily business operations, implement efficient processes, and manage a team of operations staff. Ensure the company's operational activities are optimized for productivity.",
-            "JS": "Bachelor's degree in Business or Operations Management. 5+ years of experience in an operations role, with a proven track record of process improvement."
-        },
-        "Supply Chain Analyst": {
-            "JD": "Analyze supply chain data to identify areas for improvement and cost reduction. Monitor inventory levels, track shipments, and forecast demand to optimize supply chain efficiency.",
-            "JS": "Bachelor's degree in Supply Chain Management, Logistics, or a related field. 2+ years of experience in supply chain analysis. Proficiency with supply chain management software."
-        },
-        "Project Manager": {
-            "JD": "Lead projects from conception to completion, defining project scope, setting deadlines, and managing resources. Ensure projects are delivered on time and within budget.",
-            "JS": "Bachelor's degree in Business or a related field. Project Management Professional (PMP) certification is a plus. 3+ years of experience in project management."
-        },
-        "Sales Manager": {
-            "JD": "Lead and motivate the sales team to achieve targets. Develop sales strategies, analyze market trends, and build strong client relationships to drive revenue growth.",
-            "JS": "Bachelor's degree in Business or a related field. 5+ years of experience in sales, with a proven track record of meeting or exceeding targets. Strong leadership and communication skills."
-        },
-        "Account Executive": {
-            "JD": "Manage a portfolio of client accounts, build strong relationships, and identify new business opportunities. Present products and services to clients and negotiate contracts.",
-            "JS": "Bachelor's degree in Business or Sales. 2+ years of experience as an Account Executive. Excellent interpersonal and presentation skills."
-        },
-        "Business Development Representative": {
-            "JD": "Identify and qualify new business leads through research and outreach. Schedule meetings and demonstrations for the sales team and assist in building the sales pipeline.",
-            "JS": "Bachelor's degree in a related field. 1+ years of experience in a sales or business development role. Strong prospecting and communication skills."
-        }
-    }
-    
+    jd_js_data = load_jd_catalog()
     if selected_role in jd_js_data:
         st.markdown(f"#### JD for {selected_role}")
         st.info(jd_js_data[selected_role]["JD"])
@@ -555,13 +682,120 @@ def display_workforce_planning():
     else:
         st.info("No specific JD/JS available for this role yet.")
 
+# --- Reports & Exports ---
+def display_reports_and_exports():
+    """Submits long-running reports as background jobs and lists their progress."""
+    import jobs_hr as jobs
+
+    st.header("📦 Reports & Exports")
+    st.info("Reports run in the background, so you can keep working or navigate away and download them later.")
+
+    job_labels = {info["label"]: name for name, info in jobs.JOB_TYPES.items()}
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        selected_label = st.selectbox("Report", list(job_labels.keys()))
+    with col2:
+        st.write("")
+        if st.button("Start"):
+            job_id = jobs.submit_job(job_labels[selected_label])
+            st.success(f"Job #{job_id} queued.")
+
+    st.markdown("---")
+    header_col, refresh_col = st.columns([3, 1])
+    with header_col:
+        st.subheader("Recent Jobs")
+    with refresh_col:
+        st.button("Refresh")
+
+    recent_jobs = jobs.list_jobs()
+    if not recent_jobs:
+        st.info("No jobs have been submitted yet.")
+        return
+
+    for job in recent_jobs:
+        label = jobs.JOB_TYPES.get(job['job_type'], {}).get("label", job['job_type'])
+        col1, col2, col3 = st.columns([3, 2, 1])
+        with col1:
+            st.markdown(f"**#{job['job_id']} {label}** — {job['status']}")
+            if job['message']:
+                st.caption(job['message'])
+        with col2:
+            if job['status'] in jobs.ACTIVE_STATUSES:
+                st.progress(float(job['progress']))
+        with col3:
+            if job['status'] in jobs.ACTIVE_STATUSES:
+                if st.button("Cancel", key=f"cancel_job_{job['job_id']}"):
+                    jobs.cancel_job(job['job_id'])
+                    st.rerun()
+            elif job['status'] == 'Completed' and job['result_filename']:
+                # Results can be large, so they are only fetched for the job the user asked for.
+                prepared = st.session_state.get('prepared_job_download')
+                if prepared and prepared[0] == job['job_id']:
+                    _, filename, mime, data = prepared
+                    st.download_button("Download", data, file_name=filename, mime=mime,
+                                       key=f"download_job_{job['job_id']}")
+                elif st.button("Prepare download", key=f"prepare_job_{job['job_id']}"):
+                    result = jobs.get_job_result(job['job_id'])
+                    if result:
+                        st.session_state.prepared_job_download = (job['job_id'], *result)
+                        st.rerun()
+                    else:
+                        st.error("The result is no longer available.")
+
 # --- Main Application Logic ---
+def refresh_resume_token():
+    """Puts a fresh single-use resume token in the URL; returns False if the session has ended."""
+    resume_token = db.issue_resume_token(st.session_state.session_token)
+    if not resume_token:
+        return False
+    st.query_params["resume"] = resume_token
+    st.session_state.resume_issued_at = time.monotonic()
+    return True
+
+def restore_session():
+    """Returns the logged-in user, resuming the session from the URL's resume token if this is a new browser session.
+
+    The session token never leaves the server. The URL only carries a resume token that
+    expires after a few minutes and is replaced whenever it is used, so a reload or a
+    request routed to another app worker stays logged in, but a copied link does not.
+    """
+    if 'user' in st.session_state:
+        # Rotated well before it expires, so a reload keeps working while the user is active.
+        if time.monotonic() - st.session_state.get('resume_issued_at', 0) > db.RESUME_TOKEN_TTL_MINUTES * 30:
+            if not refresh_resume_token():
+                st.query_params.clear()
+                st.session_state.clear()
+                return None
+        return st.session_state.user
+    resume_token = st.query_params.get("resume")
+    if not resume_token:
+        return None
+    user, session_token = db.resume_session(resume_token)
+    if user:
+        st.session_state.user = user
+        st.session_state.session_token = session_token
+    if not user or not refresh_resume_token():
+        st.query_params.clear()
+        st.session_state.clear()
+        return None
+    return user
+
 def main():
     """Main function to run the Streamlit app."""
-    if 'logged_in' not in st.session_state:
-        st.session_state.logged_in = False
-
-    if not st.session_state.logged_in:
+    # Each browser session waits only for its own writes to reach the read replica.
+    db.bind_write_position(st.session_state.setdefault('write_position', db.WritePosition()))
+    try:
+        partitions_ok = maintain_audit_partitions()
+    except psycopg2.OperationalError as e:
+        # Partition upkeep must not take the login page down with the database.
+        print(f"Audit partition upkeep skipped: {e}")
+        partitions_ok = False
+    if not partitions_ok:
+        # Don't keep a failed attempt for a day; the next rerun tries again.
+        maintain_audit_partitions.clear()
+    user = restore_session()
+
+    if user is None:
         st.title("💼 HR Employee Manager Login")
         st.write("Please enter your credentials to log in.")
 
@@ -573,17 +807,23 @@ def main():
                 password = st.text_input("Password", type="password")
                 submitted = st.form_submit_button("Login")
                 if submitted:
-                    if db.authenticate_user(username, password):
-                        st.session_state.logged_in = True
+                    user = db.authenticate_user(username, password)
+                    token = db.create_session(user['user_id']) if user else None
+                    if token:
+                        st.session_state.user = user
+                        st.session_state.session_token = token
+                        refresh_resume_token()
                         st.success("Logged in successfully!")
                         st.rerun()
                     else:
                         st.error("Invalid username or password.")
     else:
         st.sidebar.title("HR Dashboard")
-        st.sidebar.markdown(f"Welcome, **Shreya**!")
+        st.sidebar.markdown(f"Welcome, **{user['display_name']}**!")
         if st.sidebar.button("Logout"):
-            st.session_state.logged_in = False
+            db.delete_session(st.session_state.session_token)
+            st.query_params.clear()
+            st.session_state.clear()
             st.rerun()
 
         st.title("💼 HR Employee Manager PMS")
@@ -593,7 +833,8 @@ def main():
             "Employee Management",
             "Task Management",
             "Performance Management",
-            "Workforce & Recruitment"
+            "Workforce & Recruitment",
+            "Reports & Exports"
         ])
 
         st.markdown("---")
@@ -610,6 +851,8 @@ def main():
             display_performance_management()
         elif menu == "Workforce & Recruitment":
             display_workforce_planning()
+        elif menu == "Reports & Exports":
+            display_reports_and_exports()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,401 @@
+import csv
+import io
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+import backend_hr as db
+import reports_hr
+
+# --- Job Runner Configuration ---
+# Jobs are queued in background_jobs and claimed by whichever app process has a free
+# worker, so MAX_CONCURRENT_JOBS holds across all processes behind the load balancer.
+MAX_CONCURRENT_JOBS = 2
+ACTIVE_STATUSES = ('Queued', 'Running')
+JOB_HEARTBEAT_SECONDS = 15
+JOB_STALE_SECONDS = 120
+# Advisory lock key that serialises job claims across processes.
+JOB_CLAIM_LOCK_ID = 27001
+
+# Identifies this process as the owner of the jobs it runs.
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+JOB_TYPES = {}
+
+_executor = None
+_executor_lock = threading.Lock()
+# Ids of the jobs this process is running right now; only these are heartbeated.
+_running_jobs = set()
+_running_jobs_lock = threading.Lock()
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once cancellation has been requested."""
+
+
+class JobContext:
+    """Passed to each job so it can report progress and notice cancellation."""
+
+    def __init__(self, job_id, params):
+        self.job_id = job_id
+        self.params = params or {}
+
+    def report(self, progress, message=None):
+        """Stores progress (0.0 - 1.0) and raises JobCancelled if the job was cancelled."""
+        conn = db.get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "UPDATE background_jobs SET progress = %s, message = %s, heartbeat_at = NOW() WHERE job_id = %s "
+                "RETURNING cancel_requested",
+                (progress, message, self.job_id)
+            )
+            (cancel_requested,) = cursor.fetchone()
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+        if cancel_requested:
+            raise JobCancelled()
+
+
+def job_type(name, label):
+    """Registers a function as a job type that can be submitted from the UI."""
+    def decorator(func):
+        JOB_TYPES[name] = {"label": label, "func": func}
+        return func
+    return decorator
+
+
+def _rows_to_csv(rows):
+    buffer = io.StringIO()
+    if rows:
+        writer = csv.DictWriter(buffer, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+# --- Job Types ---
+@job_type("employee_export", "Employee export (CSV)")
+def export_employees(ctx):
+    """Exports all active employees to CSV."""
+    ctx.report(0.1, "Loading employees")
+    employees = db.get_all_employees()
+    ctx.report(0.7, f"Writing {len(employees)} employees")
+    return "employees.csv", "text/csv", _rows_to_csv(employees)
+
+
+@job_type("ratings_export", "Performance ratings export (CSV)")
+def export_ratings(ctx):
+    """Exports every performance rating to CSV."""
+    ctx.report(0.1, "Loading ratings")
+    ratings = db.get_all_ratings()
+    ctx.report(0.7, f"Writing {len(ratings)} ratings")
+    return "performance_ratings.csv", "text/csv", _rows_to_csv(ratings)
+
+
+@job_type("business_insights", "Business insights (JSON)")
+def compute_business_insights(ctx):
+    """Recomputes the business insights and returns them as JSON."""
+    ctx.report(0.1, "Computing insights")
+    insights = db.get_business_insights()
+    return "business_insights.json", "application/json", json.dumps(insights, default=str, indent=2).encode("utf-8")
+
+
+@job_type("department_report", "Department report bundle (CSV/Parquet/HTML)")
+def department_report(ctx):
+    """Builds the per-department report bundle in parallel worker processes."""
+    ctx.report(0.0, "Starting department workers")
+    bundle = reports_hr.generate_department_report(
+        workers=ctx.params.get("workers"),
+        progress=lambda fraction: ctx.report(0.9 * fraction, "Aggregating departments")
+    )
+    return "department_report.zip", "application/zip", bundle
+
+
+# --- Job Runner ---
+def _get_executor():
+    """Starts this process's workers and heartbeat on first use, after recovering jobs of dead processes."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            recover_stale_jobs()
+            _executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_JOBS, thread_name_prefix="pms-job")
+            threading.Thread(target=_heartbeat, name="pms-job-heartbeat", daemon=True).start()
+            # Picks up jobs left queued by processes that stopped before running them.
+            _executor.submit(_process_queue)
+        return _executor
+
+
+def _heartbeat():
+    """Keeps this process's running jobs fresh and restarts the queue when stale jobs free a slot.
+
+    A job left Running without a live _run_job (e.g. its final update failed) is no longer
+    heartbeated, so it goes stale and is recovered like a job of a dead process.
+    """
+    while True:
+        time.sleep(JOB_HEARTBEAT_SECONDS)
+        with _running_jobs_lock:
+            job_ids = list(_running_jobs)
+        try:
+            if job_ids:
+                conn = db.get_db_connection()
+                cursor = conn.cursor()
+                try:
+                    cursor.execute(
+                        "UPDATE background_jobs SET heartbeat_at = NOW() WHERE job_id = ANY (%s) AND status = 'Running'",
+                        (job_ids,)
+                    )
+                    conn.commit()
+                finally:
+                    cursor.close()
+                    conn.close()
+        except psycopg2.Error as e:
+            print(f"Job heartbeat failed: {e}")
+        _recover_and_drain()
+
+
+def _recover_and_drain():
+    """Recovers stale jobs and, if that freed any slots, starts the jobs queued behind them."""
+    if recover_stale_jobs():
+        _get_executor().submit(_process_queue)
+
+
+def recover_stale_jobs():
+    """Marks running jobs whose process stopped heartbeating as Failed and returns how many there were."""
+    conn = db.get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            UPDATE background_jobs
+            SET status = 'Failed', message = 'The app process running this job stopped', finished_at = NOW()
+            WHERE status = 'Running'
+              AND COALESCE(heartbeat_at, started_at, created_at) < NOW() - %s * INTERVAL '1 second'
+            """,
+            (JOB_STALE_SECONDS,)
+        )
+        conn.commit()
+        return cursor.rowcount
+    except psycopg2.Error as e:
+        print(f"Database error: {e}")
+        conn.rollback()
+        return 0
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _finish_job(job_id, status, message=None, result=None):
+    conn = db.get_db_connection()
+    cursor = conn.cursor()
+    try:
+        if result:
+            filename, mime, data = result
+            cursor.execute(
+                """
+                UPDATE background_jobs
+                SET status = %s, message = %s, progress = 1, result = %s, result_filename = %s,
+                    result_mime = %s, finished_at = NOW()
+                WHERE job_id = %s
+                """,
+                (status, message, psycopg2.Binary(data), filename, mime, job_id)
+            )
+        else:
+            cursor.execute(
+                "UPDATE background_jobs SET status = %s, message = %s, finished_at = NOW() WHERE job_id = %s",
+                (status, message, job_id)
+            )
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _claim_next_job():
+    """Claims the oldest queued job for this process, unless MAX_CONCURRENT_JOBS already run anywhere."""
+    conn = db.get_db_connection()
+    cursor = conn.cursor()
+    try:
+        # Held until commit, so two processes can never both see a free slot and overshoot the limit.
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", (JOB_CLAIM_LOCK_ID,))
+        # A job cancelled while still queued is never started.
+        cursor.execute(
+            """
+            UPDATE background_jobs
+            SET status = 'Running', started_at = NOW(), owner = %s, heartbeat_at = NOW()
+            WHERE job_id = (
+                    SELECT job_id FROM background_jobs
+                    WHERE status = 'Queued' AND NOT cancel_requested
+                    ORDER BY job_id
+                    LIMIT 1
+                )
+              AND (SELECT COUNT(*) FROM background_jobs WHERE status = 'Running') < %s
+            RETURNING job_id, job_type, params
+            """,
+            (WORKER_ID, MAX_CONCURRENT_JOBS)
+        )
+        claimed = cursor.fetchone()
+        conn.commit()
+        return claimed
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _process_queue():
+    """Runs queued jobs until none can be claimed.
+
+    Every finished job drains the queue again, so a job queued while all slots were busy
+    is started by whichever process frees a slot first.
+    """
+    while True:
+        claimed = _claim_next_job()
+        if claimed is None:
+            return
+        _run_job(*claimed)
+
+
+def _run_job(job_id, name, params):
+    with _running_jobs_lock:
+        _running_jobs.add(job_id)
+    try:
+        _execute_job(job_id, name, params)
+    finally:
+        with _running_jobs_lock:
+            _running_jobs.discard(job_id)
+
+
+def _execute_job(job_id, name, params):
+    try:
+        if name not in JOB_TYPES:
+            raise ValueError(f"Unknown job type: {name}")
+        result = JOB_TYPES[name]["func"](JobContext(job_id, params))
+        _finish_job(job_id, 'Completed', "Done", result)
+    except JobCancelled:
+        _finish_job(job_id, 'Cancelled', "Cancelled by user")
+    except Exception as e:
+        print(f"Background job {job_id} failed: {e}")
+        _finish_job(job_id, 'Failed', str(e))
+
+
+def submit_job(name, params=None):
+    """Queues a job and returns its id; an identical job that is still active is reused."""
+    if name not in JOB_TYPES:
+        raise ValueError(f"Unknown job type: {name}")
+    executor = _get_executor()
+    # Jobs of crashed processes must not be reused as the "still active" duplicate.
+    recover_stale_jobs()
+    params_json = json.dumps(params or {}, sort_keys=True)
+    conn = db.get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            SELECT job_id FROM background_jobs
+            WHERE job_type = %s AND params = %s::jsonb AND status IN %s AND NOT cancel_requested
+            ORDER BY job_id DESC LIMIT 1
+            """,
+            (name, params_json, ACTIVE_STATUSES)
+        )
+        existing = cursor.fetchone()
+        if existing:
+            return existing[0]
+        cursor.execute(
+            "INSERT INTO background_jobs (job_type, params) VALUES (%s, %s::jsonb) RETURNING job_id",
+            (name, params_json)
+        )
+        job_id = cursor.fetchone()[0]
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+    executor.submit(_process_queue)
+    return job_id
+
+
+def cancel_job(job_id):
+    """Requests cancellation.
+
+    Queued jobs, and running jobs whose process stopped, are cancelled at once; live running
+    jobs stop at their next progress report.
+    """
+    conn = db.get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            WITH job AS (
+                SELECT job_id,
+                       status = 'Queued'
+                       OR COALESCE(heartbeat_at, started_at, created_at) < NOW() - %s * INTERVAL '1 second' AS stop_now
+                FROM background_jobs
+                WHERE job_id = %s AND status IN %s
+            )
+            UPDATE background_jobs b
+            SET cancel_requested = TRUE,
+                status = CASE WHEN job.stop_now THEN 'Cancelled' ELSE b.status END,
+                finished_at = CASE WHEN job.stop_now THEN NOW() ELSE b.finished_at END
+            FROM job
+            WHERE b.job_id = job.job_id
+            """,
+            (JOB_STALE_SECONDS, job_id, ACTIVE_STATUSES)
+        )
+        conn.commit()
+        return cursor.rowcount > 0
+    except psycopg2.Error as e:
+        print(f"Database error: {e}")
+        conn.rollback()
+        return False
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def list_jobs(limit=20):
+    """Fetches the most recent jobs without their result payloads; jobs of stopped processes show as Failed."""
+    _recover_and_drain()
+    conn = db.get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            SELECT job_id, job_type, status, progress, message, result_filename,
+                   created_at, started_at, finished_at
+            FROM background_jobs
+            ORDER BY job_id DESC
+            LIMIT %s;
+            """,
+            (limit,)
+        )
+        columns = [desc[0] for desc in cursor.description]
+        jobs = cursor.fetchall()
+        return [dict(zip(columns, row)) for row in jobs]
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def get_job_result(job_id):
+    """Returns (filename, mime type, bytes) for a completed job, or None."""
+    conn = db.get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "SELECT result_filename, result_mime, result FROM background_jobs WHERE job_id = %s AND status = 'Completed'",
+            (job_id,)
+        )
+        row = cursor.fetchone()
+        if not row:
+            return None
+        filename, mime, data = row
+        return filename, mime, bytes(data)
+    finally:
+        cursor.close()
+        conn.close()
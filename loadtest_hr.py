@@ -0,0 +1,303 @@
+"""Simulates many concurrent HR users against a scratch database (see bench_reports.py).
+
+Every simulated user runs on its own thread. It repeatedly plays a scenario made of
+the same backend calls the app's pages make, and each call is timed. Connections to
+the database are sampled from pg_stat_activity while the test runs:
+
+    python loadtest_hr.py --dbname pms_bench --create-users 200
+    python loadtest_hr.py --dbname pms_bench --users 200 --duration 60
+    python loadtest_hr.py --dbname pms_bench --users 100 --scenarios dashboard,search
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+import backend_hr as db
+import search_hr
+
+LOADTEST_PASSWORD = "loadtest"
+PAGE_LOADS_PER_SESSION = 5
+CONNECTION_SAMPLE_SECONDS = 1
+
+
+def loadtest_username(i):
+    return f"loadtest{i:04d}"
+
+
+def percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+class Recorder:
+    """Collects per-step latencies, finished scenarios and errors from all simulated users."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.scenarios = {}
+        self.errors = {}
+
+    def record(self, step, elapsed):
+        with self._lock:
+            self.latencies.setdefault(step, []).append(elapsed)
+
+    def timed(self, step, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        self.record(step, time.perf_counter() - start)
+        return result
+
+    def scenario_done(self, name):
+        with self._lock:
+            self.scenarios[name] = self.scenarios.get(name, 0) + 1
+
+    def error(self, message):
+        with self._lock:
+            self.errors[message] = self.errors.get(message, 0) + 1
+
+
+class ConnectionMonitor(threading.Thread):
+    """Samples this database's connections from pg_stat_activity until stopped."""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.samples = []  # (total, active, idle in transaction)
+        self.sessions_opened = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        conn = psycopg2.connect(**db.DB_CONFIG)
+        conn.autocommit = True
+        cursor = conn.cursor()
+        try:
+            start_sessions = self._sessions(cursor)
+            while not self._stop_event.wait(CONNECTION_SAMPLE_SECONDS):
+                cursor.execute("""
+                    SELECT COUNT(*),
+                           COUNT(*) FILTER (WHERE state = 'active'),
+                           COUNT(*) FILTER (WHERE state LIKE 'idle in transaction%')
+                    FROM pg_stat_activity
+                    WHERE datname = current_database() AND pid <> pg_backend_pid()
+                """)
+                self.samples.append(cursor.fetchone())
+            end_sessions = self._sessions(cursor)
+            if start_sessions is not None and end_sessions is not None:
+                self.sessions_opened = end_sessions - start_sessions
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def _sessions(cursor):
+        # pg_stat_database.sessions (PostgreSQL 14+) counts every connection ever opened.
+        try:
+            cursor.execute("SELECT sessions FROM pg_stat_database WHERE datname = current_database()")
+            return cursor.fetchone()[0]
+        except psycopg2.Error:
+            return None
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class SimulatedUser:
+    """One HR user: their login, their own search cache, and a recorder for timings."""
+
+    def __init__(self, recorder, username, think_time, search_terms):
+        self.recorder = recorder
+        self.username = username
+        self.think_time = think_time
+        self.search_terms = search_terms
+        self.searcher = search_hr.EmployeeSearch()
+
+    def call(self, step, func, *args):
+        return self.recorder.timed(step, func, *args)
+
+    def think(self):
+        time.sleep(random.uniform(0, 2 * self.think_time))
+
+
+# --- Scenarios ---
+# Each scenario replays the backend calls of one page interaction in frontend_hr.py.
+def session_scenario(sim):
+    """Logs in, resumes the session on several page loads, saves per-user state and logs out."""
+    user = sim.call("login", db.authenticate_user, sim.username, LOADTEST_PASSWORD)
+    if not user:
+        raise RuntimeError("login failed")
+    token = sim.call("create_session", db.create_session, user['user_id'])
+    if not token:
+        raise RuntimeError("create_session failed")
+    resume_token = sim.call("issue_resume_token", db.issue_resume_token, token)
+
+    for _ in range(PAGE_LOADS_PER_SESSION):
+        sim.think()
+        # A fresh browser session, or a request routed to another app worker, resumes from the
+        # URL's single-use token and puts a new one in its place.
+        resumed, token = sim.call("resume_session", db.resume_session, resume_token)
+        if not resumed:
+            raise RuntimeError("session lost")
+        resume_token = sim.call("issue_resume_token", db.issue_resume_token, token)
+        sim.call("load_state", db.get_user_state, user['user_id'], "recruitment_funnel")
+
+    funnel = {"columns": ["Department", "Applicants", "Hires"],
+              "data": [["Engineering", random.randint(100, 500), random.randint(10, 100)]]}
+    if not sim.call("save_state", db.set_user_state, user['user_id'], "recruitment_funnel", funnel):
+        raise RuntimeError("save_state failed")
+    sim.call("logout", db.delete_session, token)
+
+
+def dashboard_scenario(sim):
+    """Opens the Employee Dashboard and flips through its charts."""
+    sim.call("insights", db.get_business_insights)
+    sim.think()
+    sim.call("salary_histogram", db.get_salary_histogram)
+    sim.think()
+    sim.call("hiring_trend", db.get_hiring_trend)
+
+
+def search_scenario(sim):
+    """Types an employee's name into the search box one character at a time."""
+    if not sim.search_terms:
+        raise RuntimeError("no employees to search for")
+    term = random.choice(sim.search_terms)
+    for length in range(search_hr.MIN_QUERY_LENGTH, min(len(term), 8) + 1):
+        start = time.perf_counter()
+        _, source = sim.searcher.search(term[:length])
+        # Steps are split by where the answer came from, so cache hits don't hide database latency.
+        sim.recorder.record(f"search ({source})", time.perf_counter() - start)
+        time.sleep(random.uniform(0, sim.think_time / 2))
+
+
+def task_update_scenario(sim):
+    """Opens Task Management, then moves one open task between To Do and In Progress."""
+    sim.call("task_summary", db.get_task_schedule_summary)
+    tasks = sim.call("task_page", db.get_task_schedule_page, None, 0, 25)
+    if not tasks:
+        raise RuntimeError("no open tasks")
+    sim.think()
+    task = random.choice(tasks)
+    # Open tasks stay open, so the dataset doesn't drift over a long run.
+    new_status = 'In Progress' if task['status'] == 'To Do' else 'To Do'
+    if not sim.call("update_task", db.update_task_status, task['task_id'], new_status):
+        raise RuntimeError("update_task_status failed")
+
+
+def rating_scenario(sim):
+    """Rates a random HR employee on behalf of their manager."""
+    hr_employees = sim.call("hr_employees", db.get_hr_employees)
+    if not hr_employees:
+        raise RuntimeError("no HR employees")
+    employee_id = random.choice(list(hr_employees))
+    chain = sim.call("management_chain", db.get_management_chain, employee_id)
+    rater_id = chain[0]['employee_id'] if chain else employee_id
+    sim.think()
+    if not sim.call("give_rating", db.give_rating_to_employee, employee_id, rater_id, random.randint(1, 5), "Load test rating"):
+        raise RuntimeError("give_rating_to_employee failed")
+
+
+SCENARIOS = {
+    "session": session_scenario,
+    "dashboard": dashboard_scenario,
+    "search": search_scenario,
+    "task_update": task_update_scenario,
+    "rating": rating_scenario,
+}
+
+
+def run_user(sim, scenarios, deadline):
+    while time.monotonic() < deadline:
+        name = random.choice(scenarios)
+        try:
+            SCENARIOS[name](sim)
+            sim.recorder.scenario_done(name)
+        except Exception as e:
+            sim.recorder.error(f"{name}: {e}")
+        sim.think()
+
+
+def create_users(count):
+    """Creates loadtest0000.. accounts; existing ones are left as they are."""
+    # Password hashing dominates here and releases the GIL, so threads help.
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(
+            lambda i: db.create_user(loadtest_username(i), LOADTEST_PASSWORD, f"Load Test {i}"), range(count)
+        ))
+
+
+def report(recorder, monitor, users, elapsed):
+    calls = sum(len(timings) for timings in recorder.latencies.values())
+    scenarios = sum(recorder.scenarios.values())
+    print(f"{users} users for {elapsed:.0f}s: {scenarios} scenarios ({scenarios / elapsed:.1f}/s), "
+          f"{calls} backend calls ({calls / elapsed:.1f}/s), {sum(recorder.errors.values())} errors")
+    print("  " + ", ".join(f"{name} {count}" for name, count in sorted(recorder.scenarios.items())))
+
+    if monitor.samples:
+        totals = [total for total, _, _ in monitor.samples]
+        print(f"Connections: avg {statistics.mean(totals):.1f}, peak {max(totals)}, "
+              f"peak active {max(active for _, active, _ in monitor.samples)}, "
+              f"peak idle in transaction {max(idle for _, _, idle in monitor.samples)}")
+    if monitor.sessions_opened is not None:
+        print(f"Connections opened: {monitor.sessions_opened} ({monitor.sessions_opened / elapsed:.1f}/s)")
+    print(f"{'step':<20} {'calls':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for step, timings in sorted(recorder.latencies.items()):
+        timings.sort()
+        print(f"{step:<20} {len(timings):>7} {percentile(timings, 0.5) * 1000:>8.1f} "
+              f"{percentile(timings, 0.95) * 1000:>8.1f} {percentile(timings, 0.99) * 1000:>8.1f} "
+              f"{timings[-1] * 1000:>8.1f}")
+    for message, count in sorted(recorder.errors.items()):
+        print(f"  error x{count}: {message}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dbname", default="pms_bench")
+    parser.add_argument("--create-users", type=int, default=0, help="create this many load test accounts first")
+    parser.add_argument("--users", type=int, default=50, help="concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to run after ramp-up starts")
+    parser.add_argument("--ramp-up", type=float, default=5, help="seconds over which users are started")
+    parser.add_argument("--think-time", type=float, default=0.5, help="mean pause between page loads")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma separated scenario names")
+    args = parser.parse_args()
+
+    # The backend functions connect with DB_CONFIG, so point it at the scratch database; reads
+    # stay on it too, rather than going to a replica of the production database.
+    db.DB_CONFIG["dbname"] = args.dbname
+    db.READ_DB_CONFIG = None
+    if args.create_users:
+        start = time.perf_counter()
+        create_users(args.create_users)
+        print(f"Created up to {args.create_users} users in {time.perf_counter() - start:.1f}s")
+
+    scenarios = args.scenarios.split(",")
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    search_terms = [employee['name'] for employee in db.get_all_employees()] if "search" in scenarios else []
+
+    recorder = Recorder()
+    monitor = ConnectionMonitor()
+    monitor.start()
+    start = time.monotonic()
+    deadline = start + args.duration
+    threads = []
+    for i in range(args.users):
+        sim = SimulatedUser(recorder, loadtest_username(i), args.think_time, search_terms)
+        thread = threading.Thread(target=run_user, args=(sim, scenarios, deadline), daemon=True)
+        thread.start()
+        threads.append(thread)
+        time.sleep(args.ramp_up / args.users)
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+    monitor.stop()
+    report(recorder, monitor, args.users, elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+import io
+import multiprocessing
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import psycopg2
+import pandas as pd
+import backend_hr as db
+
+# --- Report Configuration ---
+# Fixed salary bin edges so per-department histograms can be summed directly.
+SALARY_BIN_EDGES = [0, 50000, 75000, 100000, 125000, 150000, 200000]
+SALARY_BIN_LABELS = [
+    f"{low:,}-{high:,}" for low, high in zip(SALARY_BIN_EDGES, SALARY_BIN_EDGES[1:])
+] + [f"{SALARY_BIN_EDGES[-1]:,}+"]
+RATING_VALUES = [1, 2, 3, 4, 5]
+
+_worker_conn = None
+
+
+# --- Worker Side ---
+def _init_worker(db_config):
+    """Opens the connection each worker process keeps for all of its departments."""
+    global _worker_conn
+    _worker_conn = psycopg2.connect(**db_config)
+    _worker_conn.set_session(readonly=True, autocommit=True)
+
+
+def _department_partial(department_id):
+    """Computes the partial aggregates for a single department."""
+    cursor = _worker_conn.cursor()
+    try:
+        cursor.execute("SELECT department_name FROM departments WHERE department_id = %s", (department_id,))
+        (department_name,) = cursor.fetchone()
+
+        cursor.execute("""
+            SELECT COUNT(*), COUNT(salary), SUM(salary), MIN(salary), MAX(salary)
+            FROM employees
+            WHERE department_id = %s AND is_active = TRUE
+        """, (department_id,))
+        headcount, salary_count, salary_sum, salary_min, salary_max = cursor.fetchone()
+
+        cursor.execute("""
+            SELECT width_bucket(salary, %s::numeric[]) AS bucket, COUNT(*)
+            FROM employees
+            WHERE department_id = %s AND is_active = TRUE AND salary IS NOT NULL
+            GROUP BY bucket
+        """, (SALARY_BIN_EDGES, department_id))
+        salary_histogram = [0] * len(SALARY_BIN_LABELS)
+        for bucket, count in cursor.fetchall():
+            # width_bucket returns 1 for the first bin; negative salaries fall into bucket 0.
+            salary_histogram[max(bucket, 1) - 1] += count
+
+        cursor.execute("""
+            SELECT t.status, COUNT(*)
+            FROM tasks t
+            JOIN employees e ON t.employee_id = e.employee_id
+            WHERE e.department_id = %s AND e.is_active = TRUE
+            GROUP BY t.status
+        """, (department_id,))
+        task_counts = dict(cursor.fetchall())
+
+        cursor.execute("""
+            SELECT pr.rating, COUNT(*)
+            FROM performance_ratings pr
+            JOIN employees e ON pr.employee_id = e.employee_id
+            WHERE e.department_id = %s AND e.is_active = TRUE AND pr.rating IS NOT NULL
+            GROUP BY pr.rating
+        """, (department_id,))
+        rating_counts = dict(cursor.fetchall())
+
+        return {
+            "department_id": department_id,
+            "department_name": department_name.title(),
+            "headcount": headcount,
+            "salary_count": salary_count,
+            "salary_sum": float(salary_sum or 0),
+            "salary_min": float(salary_min) if salary_min is not None else None,
+            "salary_max": float(salary_max) if salary_max is not None else None,
+            "salary_histogram": salary_histogram,
+            "task_counts": task_counts,
+            "rating_counts": rating_counts,
+        }
+    finally:
+        cursor.close()
+
+
+# --- Merging ---
+def _summary_row(name, headcount, salary_count, salary_sum, salary_min, salary_max, task_counts, rating_counts):
+    tasks_total = sum(task_counts.values())
+    ratings_total = sum(rating_counts.values())
+    return {
+        "department": name,
+        "headcount": headcount,
+        # Averaged over employees with a salary, like AVG(salary) in get_business_insights().
+        "avg_salary": round(salary_sum / salary_count, 2) if salary_count else None,
+        "min_salary": salary_min,
+        "max_salary": salary_max,
+        "tasks_total": tasks_total,
+        "tasks_completed": task_counts.get('Completed', 0),
+        "completion_rate": round(task_counts.get('Completed', 0) / tasks_total, 4) if tasks_total else None,
+        "ratings_total": ratings_total,
+        "avg_rating": round(sum(r * c for r, c in rating_counts.items()) / ratings_total, 2) if ratings_total else None,
+    }
+
+
+def merge_partials(partials):
+    """Merges per-department partials into summary, salary and rating tables (DataFrames)."""
+    partials = sorted(partials, key=lambda p: p["department_name"])
+    summary_rows, salary_rows, rating_rows = [], [], []
+    total_task_counts, total_rating_counts = {}, {}
+    total_histogram = [0] * len(SALARY_BIN_LABELS)
+
+    for p in partials:
+        summary_rows.append(_summary_row(
+            p["department_name"], p["headcount"], p["salary_count"], p["salary_sum"], p["salary_min"], p["salary_max"],
+            p["task_counts"], p["rating_counts"]
+        ))
+        for label, count in zip(SALARY_BIN_LABELS, p["salary_histogram"]):
+            salary_rows.append({"department": p["department_name"], "salary_band": label, "count": count})
+        for rating in RATING_VALUES:
+            rating_rows.append({"department": p["department_name"], "rating": rating,
+                                "count": p["rating_counts"].get(rating, 0)})
+        for status, count in p["task_counts"].items():
+            total_task_counts[status] = total_task_counts.get(status, 0) + count
+        for rating, count in p["rating_counts"].items():
+            total_rating_counts[rating] = total_rating_counts.get(rating, 0) + count
+        total_histogram = [a + b for a, b in zip(total_histogram, p["salary_histogram"])]
+
+    mins = [p["salary_min"] for p in partials if p["salary_min"] is not None]
+    maxes = [p["salary_max"] for p in partials if p["salary_max"] is not None]
+    summary_rows.append(_summary_row(
+        "All Departments", sum(p["headcount"] for p in partials), sum(p["salary_count"] for p in partials),
+        sum(p["salary_sum"] for p in partials),
+        min(mins) if mins else None, max(maxes) if maxes else None, total_task_counts, total_rating_counts
+    ))
+    for label, count in zip(SALARY_BIN_LABELS, total_histogram):
+        salary_rows.append({"department": "All Departments", "salary_band": label, "count": count})
+    for rating in RATING_VALUES:
+        rating_rows.append({"department": "All Departments", "rating": rating,
+                            "count": total_rating_counts.get(rating, 0)})
+
+    return {
+        "department_summary": pd.DataFrame(summary_rows),
+        "salary_distribution": pd.DataFrame(salary_rows),
+        "rating_distribution": pd.DataFrame(rating_rows),
+    }
+
+
+def build_report_bundle(tables):
+    """Writes the report tables as CSV, Parquet (when available) and HTML into a single zip archive."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as bundle:
+        html_sections = []
+        for name, df in tables.items():
+            bundle.writestr(f"{name}.csv", df.to_csv(index=False))
+            try:
+                parquet_buffer = io.BytesIO()
+                df.to_parquet(parquet_buffer, index=False)
+                bundle.writestr(f"{name}.parquet", parquet_buffer.getvalue())
+            except ImportError:
+                # Parquet needs pyarrow or fastparquet; the CSV and HTML files are still written.
+                pass
+            html_sections.append(f"<h2>{name.replace('_', ' ').title()}</h2>\n{df.to_html(index=False)}")
+        html = "<html><head><meta charset='utf-8'><title>Department Report</title></head><body>\n<h1>Department Report</h1>\n"
+        html += "\n".join(html_sections) + "\n</body></html>"
+        bundle.writestr("report.html", html)
+    return buffer.getvalue()
+
+
+# --- Report Engine ---
+def _warm_up(_):
+    # Stays busy briefly, so each warm-up task lands on a different (newly spawned) worker.
+    time.sleep(0.1)
+    return os.getpid()
+
+
+def get_department_ids(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT department_id FROM departments ORDER BY department_id")
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def start_worker_pool(workers, db_config, warm=False):
+    """Creates the worker process pool; with `warm`, waits until every worker has started.
+
+    Spawned workers import pandas, psycopg2 and backend_hr and open their connection
+    before doing any work; warming moves that fixed cost out of the first report.
+    """
+    # "spawn" avoids forking the multi-threaded Streamlit server process.
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_init_worker, initargs=(db_config,))
+    if warm:
+        list(pool.map(_warm_up, range(workers)))
+    return pool
+
+
+def compute_partials(pool, department_ids, progress=None):
+    """Computes the partial aggregates of every department on an existing pool."""
+    partials = []
+    futures = [pool.submit(_department_partial, department_id) for department_id in department_ids]
+    try:
+        for future in as_completed(futures):
+            partials.append(future.result())
+            if progress:
+                progress(len(partials) / len(futures))
+    finally:
+        # Drops departments that have not started yet if the caller aborts (e.g. a cancelled job).
+        for future in futures:
+            future.cancel()
+    return partials
+
+
+def generate_department_report(workers=None, db_config=None, progress=None):
+    """Computes every department in parallel worker processes and returns the zipped report bundle.
+
+    `progress`, if given, is called with the completed fraction after each department.
+    """
+    # Reports read from the replica when it is caught up; the workers follow to the same server.
+    if db_config:
+        conn = psycopg2.connect(**db_config)
+    else:
+        conn, db_config = db.get_read_connection()
+    try:
+        department_ids = get_department_ids(conn)
+    finally:
+        conn.close()
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(department_ids) or 1))
+    pool = start_worker_pool(workers, db_config)
+    try:
+        partials = compute_partials(pool, department_ids, progress)
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+    return build_report_bundle(merge_partials(partials))
@@ -0,0 +1,109 @@
+import time
+from collections import OrderedDict, deque
+
+import backend_hr as db
+
+# --- Search Configuration ---
+# The pg_trgm indexes only help LIKE '%term%' once the term has a full trigram.
+MIN_QUERY_LENGTH = 3
+CACHE_SIZE = 50
+CACHE_TTL_SECONDS = 60
+# At most RATE_LIMIT database searches per RATE_WINDOW_SECONDS for one session.
+RATE_LIMIT = 5
+RATE_WINDOW_SECONDS = 3
+
+# Where a search result came from
+SOURCE_CACHE = 'cache'
+SOURCE_REFINED = 'refined'
+SOURCE_DATABASE = 'database'
+SOURCE_THROTTLED = 'throttled'
+SOURCE_TOO_SHORT = 'too_short'
+
+
+def _matches(employee, term):
+    """Mirrors the backend's case-insensitive substring match on name or email."""
+    return term in (employee['name'] or '').lower() or term in (employee['email'] or '').lower()
+
+
+class EmployeeSearch:
+    """Per-session search front end over backend_hr.search_employees().
+
+    Keeps an LRU cache of recent results. A query that extends a cached one (for
+    example "pri" -> "priy") is answered by filtering the cached superset locally,
+    because every match of the longer term also matches the shorter one.
+
+    Streamlit's text box only submits on Enter or when it loses focus, so in the app each
+    search is a submitted query rather than a keystroke. Refinement pays off when the user
+    narrows a previous query; the load test types term by term to exercise it.
+    """
+
+    def __init__(self):
+        self._cache = OrderedDict()  # term -> (cached_at, results)
+        self._db_searches = deque()  # timestamps of recent database searches
+        self._latencies = deque(maxlen=500)
+        self.counts = {SOURCE_CACHE: 0, SOURCE_REFINED: 0, SOURCE_DATABASE: 0, SOURCE_THROTTLED: 0}
+
+    def search(self, query):
+        """Returns (results, source); results is None when the query is too short or throttled."""
+        term = query.strip().lower()
+        if len(term) < MIN_QUERY_LENGTH:
+            return None, SOURCE_TOO_SHORT
+
+        start = time.perf_counter()
+        now = time.monotonic()
+        results, source, cached_at = self._lookup(term, now)
+        if results is None:
+            if self._rate_limited(now):
+                self.counts[SOURCE_THROTTLED] += 1
+                return None, SOURCE_THROTTLED
+            self._db_searches.append(now)
+            results, source, cached_at = db.search_employees(term), SOURCE_DATABASE, now
+
+        if source != SOURCE_CACHE:
+            self._store(term, results, cached_at)
+        self.counts[source] += 1
+        self._latencies.append(time.perf_counter() - start)
+        return results, source
+
+    def _lookup(self, term, now):
+        entry = self._cache.get(term)
+        if entry and now - entry[0] < CACHE_TTL_SECONDS:
+            self._cache.move_to_end(term)
+            return entry[1], SOURCE_CACHE, entry[0]
+
+        # The longest fresh cached term contained in this one gives the smallest superset.
+        supersets = [key for key, (cached_at, _) in self._cache.items()
+                     if key in term and now - cached_at < CACHE_TTL_SECONDS]
+        if supersets:
+            key = max(supersets, key=len)
+            cached_at, superset = self._cache[key]
+            self._cache.move_to_end(key)
+            # Refined results keep their superset's timestamp so they expire together.
+            return [emp for emp in superset if _matches(emp, term)], SOURCE_REFINED, cached_at
+        return None, None, None
+
+    def _store(self, term, results, cached_at):
+        self._cache[term] = (cached_at, results)
+        self._cache.move_to_end(term)
+        while len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    def _rate_limited(self, now):
+        while self._db_searches and now - self._db_searches[0] > RATE_WINDOW_SECONDS:
+            self._db_searches.popleft()
+        return len(self._db_searches) >= RATE_LIMIT
+
+    def clear(self):
+        """Drops cached results, e.g. after employees were added, changed or deleted."""
+        self._cache.clear()
+
+    def stats(self):
+        """Returns the cache hit rate and p95 search latency (ms) for this session."""
+        answered = self.counts[SOURCE_CACHE] + self.counts[SOURCE_REFINED] + self.counts[SOURCE_DATABASE]
+        latencies = sorted(self._latencies)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000 if latencies else None
+        return {
+            **self.counts,
+            "hit_rate": (self.counts[SOURCE_CACHE] + self.counts[SOURCE_REFINED]) / answered if answered else None,
+            "p95_ms": p95,
+        }
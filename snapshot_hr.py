@@ -0,0 +1,377 @@
+"""Exports the PMS tables to partitioned Parquet snapshots for offline analytics.
+
+    python snapshot_hr.py export --dir snapshots           # full the first time, incremental after
+    python snapshot_hr.py export --dir snapshots --full    # rewrite everything, dropping old partitions
+    python snapshot_hr.py insights --dir snapshots
+
+Each run streams every table through a server-side cursor, in chunks, into one
+partition per table: <dir>/<table>/snapshot=<n>/part-0.parquet. manifest.json lists
+the partitions of each table and its high-water mark, so the next run only exports
+rows added or changed since. SnapshotStore answers queries from the files alone,
+with DuckDB when it is installed and pandas otherwise. Writing needs pyarrow.
+"""
+import argparse
+import datetime
+import json
+import os
+import shutil
+
+import psycopg2
+from psycopg2 import sql
+import backend_hr as db
+
+# --- Snapshot Configuration ---
+CHUNK_ROWS = 50000
+MANIFEST_FILE = "manifest.json"
+# Timestamp high-water marks are re-read with this overlap, so rows changed by transactions
+# still open during the previous run are not missed. Rows read twice are harmless: queries
+# keep only the latest snapshot of each key.
+HIGH_WATER_OVERLAP = datetime.timedelta(minutes=10)
+
+# How each table is exported after the first run:
+#   full      - re-exported every time (small reference tables)
+#   timestamp - rows whose `column` is newer than the last snapshot
+#   audit     - employees with employee_audit entries newer than the last snapshot; deleted
+#               (archived) employees are written as tombstone rows with _deleted set
+# Archiving and restoring move rows between tables without leaving a trace in either, so
+# at query time a row only counts while it belongs to the current set of its `owner`
+# table, and archived employees only while they are not `superseded_by` a live one.
+# Tables are listed so that owners come before the tables that depend on them.
+SNAPSHOT_TABLES = {
+    "departments": {"key": "department_id", "mode": "full"},
+    "recruitment": {"key": "recruitment_id", "mode": "full"},
+    "employees": {"key": "employee_id", "mode": "audit", "exclude": ["profile_photo"]},
+    "tasks": {"key": "task_id", "mode": "timestamp", "column": "updated_at", "owner": "employees"},
+    "performance_ratings": {"key": "rating_id", "mode": "timestamp", "column": "updated_at", "owner": "employees"},
+    "archived_employees": {"key": "employee_id", "mode": "timestamp", "column": "archived_at",
+                           "exclude": ["profile_photo"], "superseded_by": "employees"},
+    "archived_tasks": {"key": "task_id", "mode": "timestamp", "column": "archived_at", "owner": "archived_employees"},
+    "archived_performance_ratings": {"key": "rating_id", "mode": "timestamp", "column": "archived_at",
+                                     "owner": "archived_employees"},
+}
+
+# Postgres type OIDs with a direct Arrow equivalent; anything else is written as text.
+_NUMERIC_OID = 1700
+_JSON_OIDS = (114, 3802)
+_ARROW_TYPES = {
+    16: "bool_", 20: "int64", 21: "int16", 23: "int32", 700: "float32", 701: "float64",
+    25: "string", 1042: "string", 1043: "string", 1082: "date32",
+}
+
+
+# --- Manifest ---
+def load_manifest(directory):
+    path = os.path.join(directory, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {"last_snapshot": 0, "snapshots": [], "tables": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_manifest(directory, manifest):
+    # Written to a temporary file first, so readers never see a half-written manifest.
+    path = os.path.join(directory, MANIFEST_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+# --- Export ---
+def _column_spec(column):
+    """Returns the Arrow type for a result column and a converter for its values (or None)."""
+    import pyarrow as pa
+
+    if column.type_code == _NUMERIC_OID:
+        if column.precision:
+            return pa.decimal128(column.precision, column.scale or 0), None
+        return pa.float64(), float
+    if column.type_code in _JSON_OIDS:
+        return pa.string(), json.dumps
+    if column.type_code == 1114:
+        return pa.timestamp("us"), None
+    if column.type_code == 1184:
+        return pa.timestamp("us", tz="UTC"), None
+    if column.type_code in _ARROW_TYPES:
+        return getattr(pa, _ARROW_TYPES[column.type_code])(), None
+    return pa.string(), str
+
+
+def _write_partition(cursor, path):
+    """Streams a named cursor into one Parquet file, a row group per chunk, and returns the row count."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer, schema, specs, rows_written = None, None, None, 0
+    tmp_path = path + ".tmp"
+    try:
+        while True:
+            rows = cursor.fetchmany(CHUNK_ROWS)
+            if not rows:
+                break
+            if writer is None:
+                specs = [_column_spec(column) for column in cursor.description]
+                schema = pa.schema([pa.field(column.name, arrow_type)
+                                    for column, (arrow_type, _) in zip(cursor.description, specs)])
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                writer = pq.ParquetWriter(tmp_path, schema, compression="zstd")
+            arrays = []
+            for values, (arrow_type, convert) in zip(zip(*rows), specs):
+                if convert:
+                    values = [None if value is None else convert(value) for value in values]
+                arrays.append(pa.array(values, type=arrow_type))
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            rows_written += len(rows)
+    except Exception:
+        if writer is not None:
+            writer.close()
+            os.remove(tmp_path)
+        raise
+    if writer is not None:
+        writer.close()
+        os.replace(tmp_path, path)
+    return rows_written
+
+
+def _plan(conn, table, spec, high_water):
+    """Returns the export query for a table, its parameters and the table's new high-water mark."""
+    mode = spec["mode"]
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "SELECT column_name FROM information_schema.columns WHERE table_schema = current_schema() AND table_name = %s "
+            "ORDER BY ordinal_position",
+            (table,)
+        )
+        columns = [name for (name,) in cursor.fetchall() if name not in spec.get("exclude", ())]
+        new_high_water = None
+        if mode == "audit":
+            cursor.execute("SELECT MAX(changed_at) FROM employee_audit")
+            new_high_water = cursor.fetchone()[0]
+        elif mode == "timestamp":
+            cursor.execute(sql.SQL("SELECT MAX({}) FROM {}").format(sql.Identifier(spec["column"]), sql.Identifier(table)))
+            new_high_water = cursor.fetchone()[0]
+    finally:
+        cursor.close()
+
+    key = sql.Identifier(spec["key"])
+    select = "SELECT {}, FALSE AS _deleted FROM {}" if mode == "audit" else "SELECT {} FROM {}"
+    query = sql.SQL(select).format(
+        sql.SQL(", ").join(sql.Identifier(column) for column in columns), sql.Identifier(table)
+    )
+    params = None
+    if high_water is not None:
+        if mode == "timestamp":
+            query += sql.SQL(" WHERE {} > %s").format(sql.Identifier(spec["column"]))
+            params = (datetime.datetime.fromisoformat(high_water) - HIGH_WATER_OVERLAP,)
+        elif mode == "audit":
+            # Every changed employee gets a row; those no longer in the table come back as tombstones.
+            query = sql.SQL("""
+                SELECT {columns}, t.{key} IS NULL AS _deleted
+                FROM (SELECT DISTINCT employee_id FROM employee_audit WHERE changed_at > %s) c
+                LEFT JOIN {table} t ON t.{key} = c.employee_id
+            """).format(
+                columns=sql.SQL(", ").join(
+                    sql.SQL("c.employee_id AS {}").format(key) if column == spec["key"]
+                    else sql.SQL("t.{}").format(sql.Identifier(column))
+                    for column in columns
+                ),
+                key=key,
+                table=sql.Identifier(table),
+            )
+            params = (datetime.datetime.fromisoformat(high_water) - HIGH_WATER_OVERLAP,)
+
+    if isinstance(new_high_water, datetime.datetime):
+        new_high_water = new_high_water.isoformat()
+    return query.as_string(conn), params, new_high_water if new_high_water is not None else high_water
+
+
+def export_snapshot(directory, full=False, db_config=None, progress=None):
+    """Writes the next snapshot of every table and returns the number of rows written per table.
+
+    All tables are read in one REPEATABLE READ transaction, so the snapshot is consistent
+    across tables. `progress`, if given, is called with the completed fraction after each table.
+    """
+    os.makedirs(directory, exist_ok=True)
+    manifest = load_manifest(directory)
+    snapshot_id = manifest["last_snapshot"] + 1
+    written, superseded = {}, []
+
+    # Snapshots read from the replica when it is caught up, and from the primary otherwise.
+    conn = psycopg2.connect(**db_config) if db_config else db.get_read_connection()[0]
+    conn.set_session(isolation_level="REPEATABLE READ", readonly=True)
+    try:
+        for done, (table, spec) in enumerate(SNAPSHOT_TABLES.items(), start=1):
+            state = manifest["tables"].get(table)
+            # A table whose export mode changed has a high-water mark of the wrong kind.
+            full_table = full or state is None or spec["mode"] == "full" or state.get("mode") != spec["mode"]
+            query, params, high_water = _plan(conn, table, spec, None if full_table else state["high_water"])
+
+            relative_path = os.path.join(table, f"snapshot={snapshot_id}", "part-0.parquet")
+            cursor = conn.cursor(name=f"snapshot_{table}")
+            try:
+                cursor.execute(query, params)
+                rows = _write_partition(cursor, os.path.join(directory, relative_path))
+            finally:
+                cursor.close()
+
+            if full_table:
+                superseded.extend(state["files"] if state else [])
+                files = []
+            else:
+                files = list(state["files"])
+            if rows:
+                files.append({"snapshot": snapshot_id, "path": relative_path, "rows": rows})
+            manifest["tables"][table] = {"key": spec["key"], "mode": spec["mode"], "high_water": high_water,
+                                         "files": files}
+            written[table] = rows
+            if progress:
+                progress(done / len(SNAPSHOT_TABLES))
+        conn.rollback()
+    finally:
+        conn.close()
+
+    manifest["last_snapshot"] = snapshot_id
+    manifest["snapshots"].append({
+        "snapshot": snapshot_id,
+        "taken_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "full": full,
+        "rows": written,
+    })
+    _save_manifest(directory, manifest)
+    # Partitions replaced by a full export are only removed once the new manifest is in place.
+    for entry in superseded:
+        shutil.rmtree(os.path.dirname(os.path.join(directory, entry["path"])), ignore_errors=True)
+    return written
+
+
+# --- Local Query API ---
+class SnapshotStore:
+    """Reads an exported snapshot directory; never connects to Postgres.
+
+    Each table is the union of its partitions with only the latest version of every key kept,
+    minus tombstones and rows whose owner has moved (see SNAPSHOT_TABLES).
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.manifest = load_manifest(directory)
+        self._duckdb = None
+
+    def _paths(self, table):
+        state = self.manifest["tables"].get(table) if table in SNAPSHOT_TABLES else None
+        return [os.path.join(self.directory, entry["path"]) for entry in state["files"]] if state else []
+
+    def _duckdb_connection(self):
+        """Returns a DuckDB connection with a view per table, or None if duckdb is not installed."""
+        if self._duckdb is None:
+            try:
+                import duckdb
+            except ImportError:
+                return None
+            con = duckdb.connect()
+            created = set()
+            for table, spec in SNAPSHOT_TABLES.items():
+                paths = self._paths(table)
+                if not paths:
+                    continue
+                files = ", ".join("'" + path.replace("'", "''") + "'" for path in paths)
+                key = spec["key"]
+                filters, exclude = ["TRUE"], "snapshot"
+                if spec["mode"] == "audit":
+                    filters.append("NOT _deleted")
+                    exclude += ", _deleted"
+                if spec.get("owner"):
+                    filters.append(f'employee_id IN (SELECT employee_id FROM "{spec["owner"]}")'
+                                   if spec["owner"] in created else "FALSE")
+                if spec.get("superseded_by") in created:
+                    filters.append(f'"{key}" NOT IN (SELECT "{key}" FROM "{spec["superseded_by"]}")')
+                con.execute(f"""
+                    CREATE VIEW "{table}" AS
+                    SELECT * EXCLUDE ({exclude}) FROM (
+                        SELECT *
+                        FROM read_parquet([{files}], hive_partitioning = true, union_by_name = true)
+                        QUALIFY row_number() OVER (PARTITION BY "{key}" ORDER BY snapshot DESC) = 1
+                    )
+                    WHERE {" AND ".join(filters)}
+                """)
+                created.add(table)
+            self._duckdb = con
+        return self._duckdb
+
+    def table(self, name):
+        """Returns the current rows of a table as a pandas DataFrame."""
+        import pandas as pd
+
+        paths = self._paths(name)
+        if not paths:
+            return pd.DataFrame()
+        con = self._duckdb_connection()
+        if con is not None:
+            return con.execute(f'SELECT * FROM "{name}"').df()
+        # Partitions are listed oldest first, so the last row of each key is its latest version.
+        spec = SNAPSHOT_TABLES[name]
+        frames = [pd.read_parquet(path, memory_map=True) for path in paths]
+        df = pd.concat(frames, ignore_index=True).drop_duplicates(subset=spec["key"], keep="last")
+        if spec["mode"] == "audit":
+            df = df[~df["_deleted"].eq(True)].drop(columns="_deleted")
+        if spec.get("owner"):
+            owners = self.table(spec["owner"])
+            df = df[df["employee_id"].isin(owners["employee_id"])] if not owners.empty else df.iloc[0:0]
+        if spec.get("superseded_by"):
+            current = self.table(spec["superseded_by"])
+            if not current.empty:
+                df = df[~df[spec["key"]].isin(current[spec["key"]])]
+        return df.reset_index(drop=True)
+
+    def query(self, sql_text):
+        """Runs SQL against the snapshot tables with DuckDB and returns a DataFrame."""
+        con = self._duckdb_connection()
+        if con is None:
+            raise RuntimeError("SnapshotStore.query() needs the duckdb package; table() works with pandas alone.")
+        return con.execute(sql_text).df()
+
+    def business_insights(self):
+        """Computes the same figures as backend_hr.get_business_insights() from the snapshot."""
+        employees = self.table("employees")
+        departments = self.table("departments")
+        tasks = self.table("tasks")
+
+        active = employees[employees["is_active"].eq(True)].assign(salary=lambda df: df["salary"].astype(float))
+        gender_data = active["gender"].value_counts(dropna=False)
+        total_employees = int(gender_data.sum())
+        by_dept = active.merge(departments[["department_id", "department_name"]], on="department_id").groupby("department_name")
+        return {
+            "max_salary": active["salary"].max(),
+            "min_salary": active["salary"].min(),
+            "avg_salary": active["salary"].mean(),
+            "gender_ratio": {k: v / total_employees for k, v in gender_data.items()} if total_employees > 0 else {},
+            "avg_salary_by_dept": {k.title(): v for k, v in by_dept["salary"].mean().items()},
+            "employees_by_dept": {k.title(): int(v) for k, v in by_dept.size().items()},
+            "task_status_data": {k: int(v) for k, v in tasks["status"].value_counts(dropna=False).items()},
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="write the next snapshot")
+    export_parser.add_argument("--dir", default="snapshots")
+    export_parser.add_argument("--full", action="store_true", help="export every row and drop older partitions")
+    export_parser.add_argument("--dbname", default=None, help="database to export (default: DB_CONFIG)")
+    insights_parser = subparsers.add_parser("insights", help="print business insights from the snapshot")
+    insights_parser.add_argument("--dir", default="snapshots")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        db_config = dict(db.DB_CONFIG, dbname=args.dbname) if args.dbname else None
+        written = export_snapshot(args.dir, full=args.full, db_config=db_config)
+        manifest = load_manifest(args.dir)
+        print(f"Snapshot {manifest['last_snapshot']} written to {args.dir}")
+        for table, rows in written.items():
+            print(f"  {table:<20} {rows:>10} rows")
+    else:
+        print(json.dumps(SnapshotStore(args.dir).business_insights(), default=str, indent=2))
+
+
+if __name__ == "__main__":
+    main()